@@ -1,11 +1,24 @@
+import atexit
 import json
 import logging
+import logging.handlers
 import os
+import queue
 import socket
 import webbrowser
 import threading
+import time
+from datetime import datetime
 
-from flask import Flask, jsonify, render_template, request
+import requests
+
+from flask import Flask, Response, jsonify, render_template, request, stream_with_context
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
 
 from config import load_config, save_config
 from cost_tracker import cost_tracker, _lookup_pricing
@@ -17,17 +30,19 @@ from database import (
     delete_article_summary,
     get_article,
     delete_failed_summaries,
-    get_articles,
+    iter_articles,
     get_articles_for_category,
     get_available_tags,
     get_categorized_articles,
-    get_category_insight,
+    get_fresh_category_insight,
     get_duplicate_articles,
     get_embedding_stats,
     get_failure_articles,
     get_sources,
+    get_sources_version,
     get_stats,
     get_subcategories,
+    get_summaries_version,
     get_trend_analyses,
     init_db,
     insert_article,
@@ -35,6 +50,17 @@ from database import (
     save_category_insight,
     update_article_tags,
     upsert_source,
+    upsert_sources,
+)
+from embeddings import semantic_search
+from intelligence import chat as intelligence_chat
+from llm_client import get_model_name, has_api_key
+from notifier import send_report_email, send_test_email
+from summarizer import (
+    estimate_insight_cost,
+    estimate_trend_cost,
+    generate_category_insight,
+    generate_trend_analysis,
 )
 from scheduler import (
     abort_pipeline,
@@ -54,21 +80,193 @@ from scheduler import (
     trigger_manual_refresh,
     trigger_process_pending,
     trigger_send_digest,
+    wait_for_state_change,
 )
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+# Configure logging: records are handed to a queue on the calling thread and
+# formatted/written by a single listener thread, so request and pipeline
+# threads never contend on the stream handler's lock.
+_log_queue = queue.SimpleQueue()
+_log_listener = None
+_root_logger = logging.getLogger()
+if not _root_logger.handlers:
+    _stream_handler = logging.StreamHandler()
+    _stream_handler.setFormatter(
+        logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    )
+    _log_listener = logging.handlers.QueueListener(_log_queue, _stream_handler)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+    _root_logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+    _root_logger.setLevel(logging.INFO)
+
+logger = logging.getLogger(__name__)
+
+
+# Non-string dict keys (e.g. int IDs) and numpy arrays/scalars (embedding
+# scores) serialize natively; datetimes are emitted with a "Z" suffix.
+_ORJSON_OPTS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_UTC_Z
+    if orjson is not None else 0
 )
 
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson.
+
+    Used for every ``jsonify`` response and ``request.get_json`` call when
+    orjson is installed; Flask's stdlib-based provider is kept otherwise.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=_ORJSON_OPTS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, option=_ORJSON_OPTS), mimetype="application/json"
+        )
+
+
+def _json_loads(s):
+    """Decode a JSON string with orjson when available, else stdlib json."""
+    if orjson is not None:
+        return orjson.loads(s)
+    return json.loads(s)
+
+
+def _json_dumps(obj):
+    """Encode ``obj`` to JSON bytes with orjson when available, else stdlib json."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=_ORJSON_OPTS)
+    return json.dumps(obj).encode()
+
+
+# Pre-encoded bodies for fixed early-return responses. A fresh Response is
+# still built per request (after_request hooks mutate headers), but the
+# body skips JSON encoding entirely.
+_EMPTY_LIST_JSON = b"[]"
+_MISSING_CATEGORY_JSON = b'{"error":"missing category parameter"}'
+_NO_QUERY_JSON = b'{"articles":[],"error":"No query provided"}'
+
+
+def _const_json(body, status=200):
+    """Wrap pre-encoded JSON bytes in a response with the given status."""
+    return app.response_class(body, status=status, mimetype="application/json")
+
+
+def _stream_json_array(items):
+    """Return a streamed ``application/json`` response for an iterable of objects.
+
+    Each item is encoded and written as soon as it is produced, so neither
+    the full list nor the full JSON document is held in memory. The request
+    context stays active until the last byte is sent, so lazy item sources
+    may still read ``request`` while streaming.
+    """
+    def generate():
+        yield b"["
+        first = True
+        for item in items:
+            if not first:
+                yield b","
+            yield _json_dumps(item)
+            first = False
+        yield b"]"
+
+    return app.response_class(stream_with_context(generate()), mimetype="application/json")
+
+
 app = Flask(__name__)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+
+# Static assets are referenced through url_for() with a ``v=<mtime>`` query
+# (see _static_cache_buster), so browsers may cache them for a long time and
+# still pick up a new build immediately.
+app.config["SEND_FILE_MAX_AGE_DEFAULT"] = 7 * 24 * 3600
+
+_static_versions = {}
+
+
+@app.url_defaults
+def _static_cache_buster(endpoint, values):
+    """Append the file's mtime to ``url_for('static', ...)`` URLs."""
+    if endpoint != "static" or "filename" not in values:
+        return
+    filename = values["filename"]
+    version = _static_versions.get(filename)
+    if version is None:
+        try:
+            version = int(os.stat(os.path.join(app.static_folder, filename)).st_mtime)
+        except OSError:
+            version = 0
+        _static_versions[filename] = version
+    values["v"] = version
+
+
+class InvalidJSONBody(ValueError):
+    """Raised by ``_json_body`` when the request body is not valid JSON."""
+
+
+@app.errorhandler(InvalidJSONBody)
+def handle_invalid_json(e):
+    return jsonify({"error": "Invalid JSON body"}), 400
+
+
+def _json_body():
+    """Decode the raw request body as a JSON object.
+
+    Parses the bytes directly (orjson when available) without Werkzeug's
+    content-type check or text decoding, and without caching the body.
+
+    Returns:
+        The decoded dict, or ``{}`` for an empty or non-object body.
+
+    Raises:
+        InvalidJSONBody: If the body is not valid JSON.
+    """
+    raw = request.get_data(cache=False)
+    if not raw:
+        return {}
+    try:
+        data = _json_loads(raw)
+    except ValueError as e:
+        raise InvalidJSONBody(str(e)) from e
+    return data if isinstance(data, dict) else {}
+
+
+# Keep-alive session shared by the API key test endpoints so repeated
+# checks reuse TCP/TLS connections to the provider hosts.
+_http = requests.Session()
+_http.mount("https://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+# URL schemes accepted for configured feeds and ingested URLs.
+_SCHEMES = ("http://", "https://")
+
+# Read-only endpoints polled by the dashboard; answered with 304 when unchanged.
+_ETAG_PATHS = frozenset({
+    "/api/sources",
+    "/api/stats",
+    "/api/articles/categorized",
+})
 
 
 @app.after_request
 def add_no_cache_headers(response):
-    """Prevent browsers from serving stale JSON for dynamic API endpoints."""
-    if request.path.startswith("/api/"):
+    """Prevent browsers from serving stale JSON for dynamic API endpoints.
+
+    Polled read endpoints get a content ETag and ``no-cache`` instead of
+    ``no-store`` so the browser revalidates with ``If-None-Match`` and an
+    unchanged payload is answered with an empty 304.
+    """
+    if request.path in _ETAG_PATHS and request.method == "GET" and response.status_code == 200:
+        response.headers["Cache-Control"] = "no-cache"
+        response.add_etag()
+        response.make_conditional(request)
+    elif request.path.startswith("/api/"):
         response.headers["Cache-Control"] = "no-store, max-age=0"
     return response
 
@@ -97,27 +295,35 @@ def article_detail(article_id):
     if not article:
         return "Article not found", 404
 
-    # Parse JSON fields for template
-    try:
-        article["tags"] = json.loads(article.get("tags") or "[]")
-    except (json.JSONDecodeError, TypeError):
-        article["tags"] = []
-    try:
-        article["key_points"] = json.loads(article.get("key_points") or "[]")
-    except (json.JSONDecodeError, TypeError):
-        article["key_points"] = []
+    # Parse JSON fields for template (get_article guarantees valid JSON text)
+    article["tags"] = _json_loads(article["tags"])
+    article["key_points"] = _json_loads(article["key_points"])
 
     article["duplicates"] = get_duplicate_articles(article_id)
 
     return render_template("article.html", article=article)
 
 
+# Sources list and URL -> source map, rebuilt when the sources table changes.
+_sources_cache = {"ver": -1, "rows": [], "map": {}}
+
+
+def _cached_sources():
+    """Return ``(sources, url_map)``, re-querying only after a sources write."""
+    ver = get_sources_version()
+    if _sources_cache["ver"] != ver:
+        rows = get_sources()
+        _sources_cache["rows"] = rows
+        _sources_cache["map"] = {s["url"]: s for s in rows}
+        _sources_cache["ver"] = ver
+    return _sources_cache["rows"], _sources_cache["map"]
+
+
 @app.route("/settings")
 def settings_page():
     """Render the settings configuration page."""
     config = load_config()
-    sources = get_sources()
-    source_map = {s["url"]: s for s in sources}
+    _, source_map = _cached_sources()
     return render_template("settings.html", config=config, source_map=source_map)
 
 
@@ -150,8 +356,8 @@ def api_articles():
     limit = request.args.get("limit", 20, type=int)
     limit = min(limit, 100)
 
-    articles = get_articles(source_id=source_id, search=search, tag=tag, page=page, limit=limit)
-    return jsonify(articles)
+    articles = iter_articles(source_id=source_id, search=search, tag=tag, page=page, limit=limit)
+    return _stream_json_array(articles)
 
 
 @app.route("/api/articles/failures")
@@ -190,7 +396,7 @@ def api_articles_reprocess():
     Returns:
         JSON with ``status`` of 'started' or 'already_running'.
     """
-    data = request.get_json(force=True) or {}
+    data = _json_body()
     article_ids = data.get("article_ids", [])
     failure_type = data.get("failure_type", "")
 
@@ -253,15 +459,31 @@ def api_articles_categorized():
 @app.route("/api/sources")
 def api_sources():
     """Return all feed sources as JSON."""
-    sources = get_sources()
+    sources, _ = _cached_sources()
     return jsonify(sources)
 
 
+# Dashboard stats are reused for a few seconds unless summaries or sources
+# changed; scraping and fetching only ever lag by at most the TTL.
+_STATS_TTL_SECONDS = 5
+_stats_cache = {"key": None, "expires": 0.0, "stats": None}
+
+
+def _cached_stats():
+    """Return a copy of ``get_stats()``, memoized briefly between writes."""
+    key = (get_summaries_version(), get_sources_version())
+    now = time.monotonic()
+    if _stats_cache["key"] != key or now >= _stats_cache["expires"]:
+        _stats_cache["stats"] = get_stats()
+        _stats_cache["key"] = key
+        _stats_cache["expires"] = now + _STATS_TTL_SECONDS
+    return dict(_stats_cache["stats"])
+
+
 @app.route("/api/stats")
 def api_stats():
     """Return aggregate dashboard statistics as JSON."""
-    from llm_client import has_api_key
-    stats = get_stats()
+    stats = _cached_stats()
     stats["has_api_key"] = has_api_key()
     cfg = load_config()
     stats["email_mode"] = cfg.get("email_mode", "per_article")
@@ -280,7 +502,7 @@ def api_refresh():
     Returns:
         JSON with ``status`` (``"started"`` or ``"already_running"``).
     """
-    data = request.get_json(silent=True) or {}
+    data = _json_body()
     since_last_fetch = bool(data.get("since_last_fetch", False))
     days = data.get("days", 1)
     try:
@@ -309,7 +531,7 @@ def api_clear_db():
     if is_refreshing():
         return jsonify({"status": "error", "error": "Cannot clear while refresh is running"}), 409
     try:
-        data = request.get_json(silent=True) or {}
+        data = _json_body()
         days = data.get("days", 0)
         try:
             days = int(days)
@@ -334,7 +556,21 @@ def api_refresh_status():
         JSON with ``is_refreshing``, ``is_embedding``, ``is_aborting``,
         ``is_digesting``, ``stage``, ``cost_estimate``, ``actual_cost``.
     """
-    return jsonify({
+    return jsonify(_refresh_status())
+
+
+@app.route("/api/refresh-status/stream")
+def api_refresh_status_stream():
+    """Stream pipeline status as Server-Sent Events.
+
+    Preferred over polling ``/api/refresh-status``: an event carrying the
+    same JSON object is sent on connect and whenever the status changes.
+    """
+    return _sse_response(_refresh_status)
+
+
+def _refresh_status():
+    return {
         "is_refreshing": is_refreshing() or is_embedding_only(),
         "is_embedding": is_embedding_only(),
         "is_aborting": is_aborting(),
@@ -342,7 +578,63 @@ def api_refresh_status():
         "stage": get_pipeline_stage(),
         "cost_estimate": get_cost_estimate(),
         "actual_cost": get_actual_cost(),
-    })
+    }
+
+
+_SSE_KEEPALIVE_SECONDS = 15
+# Each open stream holds a waitress worker thread, so streams end after this
+# long and EventSource reconnects (after the ``retry`` delay sent up front).
+_SSE_MAX_LIFETIME_SECONDS = 60
+_SSE_RETRY_MS = 1000
+
+
+def _sse_response(payload_fn, is_final=None):
+    """Build a ``text/event-stream`` response that re-sends ``payload_fn()`` on change.
+
+    The generator blocks on the scheduler's state condition instead of
+    polling, emits an event only when the serialized payload differs from
+    the last one sent, and writes a comment line as keep-alive on idle.
+    The stream closes after ``_SSE_MAX_LIFETIME_SECONDS`` so an abandoned or
+    long-lived client cannot pin a worker thread; the browser reconnects.
+
+    Args:
+        payload_fn: Zero-argument callable returning a JSON-serializable object.
+        is_final: Optional predicate on a payload. When it returns True the
+            stream ends right after sending that payload; the client is
+            expected to close its ``EventSource`` on such an event rather
+            than reconnect.
+
+    Returns:
+        A streaming Flask ``Response``.
+    """
+    def generate():
+        deadline = time.monotonic() + _SSE_MAX_LIFETIME_SECONDS
+        version = wait_for_state_change(None)
+        last = None
+        yield f"retry: {_SSE_RETRY_MS}\n\n"
+        while True:
+            payload = payload_fn()
+            data = app.json.dumps(payload)
+            if data != last:
+                last = data
+                yield f"data: {data}\n\n"
+            if is_final is not None and is_final(payload):
+                return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            new_version = wait_for_state_change(
+                version, timeout=min(_SSE_KEEPALIVE_SECONDS, remaining)
+            )
+            if new_version == version:
+                yield ": keep-alive\n\n"
+            version = new_version
+
+    return Response(
+        generate(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.route("/api/send-digest", methods=["POST"])
@@ -427,7 +719,7 @@ def api_update_article_tags(article_id):
         JSON with ``status`` and updated ``tags`` on success, or
         ``status``/``error`` on failure.
     """
-    data = request.get_json(silent=True) or {}
+    data = _json_body()
     tags = data.get("tags")
     if not isinstance(tags, list) or not all(isinstance(t, str) for t in tags):
         return jsonify({"status": "error", "error": "tags must be a list of strings"}), 400
@@ -458,12 +750,12 @@ def api_ingest_urls():
     if is_refreshing():
         return jsonify({"status": "error", "error": "Cannot ingest while refresh is running"}), 409
 
-    data = request.get_json(silent=True) or {}
+    data = _json_body()
     raw_urls = data.get("urls", [])
 
     valid_urls = [
         u.strip() for u in raw_urls
-        if isinstance(u, str) and u.strip().startswith(("http://", "https://"))
+        if isinstance(u, str) and u.strip().startswith(_SCHEMES)
     ]
     if not valid_urls:
         return jsonify({"status": "error", "error": "No valid URLs provided"}), 400
@@ -477,8 +769,7 @@ def api_ingest_urls():
         if article_exists(url):
             skipped += 1
             continue
-        import os as _os
-        title = _os.path.basename(url.rstrip("/")) or url
+        title = os.path.basename(url.rstrip("/")) or url
         art_id = insert_article(source_id, title, url)
         if art_id:
             inserted += 1
@@ -530,7 +821,7 @@ def api_settings():
         JSON with ``status`` (``"ok"`` or ``"error"``).
     """
     try:
-        data = request.get_json()
+        data = _json_body()
         config = load_config()
 
         if "llm_provider" in data:
@@ -551,7 +842,7 @@ def api_settings():
             safe_feeds = [
                 f for f in data["feeds"]
                 if isinstance(f.get("url"), str)
-                and (f["url"].startswith("http://") or f["url"].startswith("https://"))
+                and f["url"].startswith(_SCHEMES)
             ]
             config["feeds"] = safe_feeds
 
@@ -578,8 +869,9 @@ def api_settings():
         reschedule_digest()
 
         # Sync sources to database
-        for feed in config.get("feeds", []):
-            upsert_source(feed["name"], feed["url"], feed.get("enabled", True))
+        upsert_sources(
+            [(f["name"], f["url"], f.get("enabled", True)) for f in config.get("feeds", [])]
+        )
 
         return jsonify({"status": "ok"})
     except Exception as e:
@@ -588,7 +880,7 @@ def api_settings():
 
 @app.route("/api/test-key", methods=["POST"])
 def api_test_key():
-    """Validate an OpenAI API key by listing models.
+    """Validate an OpenAI API key with an authenticated ``GET /v1/models``.
 
     Request body (JSON):
         api_key: The OpenAI API key to test.
@@ -596,24 +888,32 @@ def api_test_key():
     Returns:
         JSON with ``valid`` boolean and optional ``error`` string.
     """
-    data = request.get_json()
+    data = _json_body()
     api_key = data.get("api_key", "").strip()
     if not api_key:
         return jsonify({"valid": False, "error": "No API key provided"})
 
     try:
-        from openai import OpenAI
-
-        client = OpenAI(api_key=api_key)
-        client.models.list()
-        return jsonify({"valid": True})
+        resp = _http.get(
+            "https://api.openai.com/v1/models",
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=10,
+        )
+        if resp.status_code == 200:
+            return jsonify({"valid": True})
+        if resp.status_code == 401:
+            return jsonify({"valid": False, "error": "Invalid API key"})
+        return jsonify({"valid": False, "error": f"HTTP {resp.status_code}"})
     except Exception as e:
         return jsonify({"valid": False, "error": str(e)})
 
 
 @app.route("/api/test-anthropic-key", methods=["POST"])
 def api_test_anthropic_key():
-    """Validate an Anthropic API key by sending a minimal message.
+    """Validate an Anthropic API key with an authenticated model listing.
+
+    Uses ``GET /v1/models?limit=1``, which checks the key without
+    generating (and billing) any tokens.
 
     Request body (JSON):
         api_key: The Anthropic API key to test.
@@ -621,21 +921,23 @@ def api_test_anthropic_key():
     Returns:
         JSON with ``valid`` boolean and optional ``error`` string.
     """
-    data = request.get_json()
+    data = _json_body()
     api_key = data.get("api_key", "").strip()
     if not api_key:
         return jsonify({"valid": False, "error": "No API key provided"})
 
     try:
-        import anthropic
-
-        client = anthropic.Anthropic(api_key=api_key)
-        client.messages.create(
-            model="claude-haiku-4-5-20251001",
-            max_tokens=10,
-            messages=[{"role": "user", "content": "Hi"}],
+        resp = _http.get(
+            "https://api.anthropic.com/v1/models",
+            params={"limit": 1},
+            headers={"x-api-key": api_key, "anthropic-version": "2023-06-01"},
+            timeout=10,
         )
-        return jsonify({"valid": True})
+        if resp.status_code == 200:
+            return jsonify({"valid": True})
+        if resp.status_code == 401:
+            return jsonify({"valid": False, "error": "Invalid API key"})
+        return jsonify({"valid": False, "error": f"HTTP {resp.status_code}"})
     except Exception as e:
         return jsonify({"valid": False, "error": str(e)})
 
@@ -650,15 +952,13 @@ def api_test_malpedia_key():
     Returns:
         JSON with ``valid`` boolean and optional ``error`` string.
     """
-    data = request.get_json()
+    data = _json_body()
     api_key = data.get("api_key", "").strip()
     if not api_key:
         return jsonify({"valid": False, "error": "No API key provided"})
 
     try:
-        import requests as req
-
-        resp = req.get(
+        resp = _http.get(
             "https://malpedia.caad.fkie.fraunhofer.de/api/check/apikey",
             headers={"Authorization": f"APIToken {api_key}"},
             timeout=15,
@@ -677,9 +977,7 @@ def api_test_email():
     Returns:
         JSON with ``success`` boolean and optional ``error`` string.
     """
-    from notifier import send_test_email
-
-    data = request.get_json(silent=True) or {}
+    data = _json_body()
     smtp_cfg = None
     if data.get("smtp_host"):
         smtp_cfg = {
@@ -699,7 +997,7 @@ def api_test_email():
 def api_report():
     cfg = load_config()
     token = cfg.get("report_token", "").strip()
-    data = request.get_json(silent=True) or {}
+    data = _json_body()
 
     # Optional token check — skip if no token is configured
     if token and data.get("token") != token:
@@ -711,7 +1009,6 @@ def api_report():
     metadata    = data.get("metadata", {})
     user_note   = data.get("user_note", "")
 
-    from notifier import send_report_email
     ok, err = send_report_email(report_type, identifier, llm_content, metadata, user_note)
     if ok:
         return jsonify({"ok": True})
@@ -732,7 +1029,7 @@ def api_subcategories():
     """
     category = request.args.get("category", "").strip()
     if not category:
-        return jsonify([])
+        return _const_json(_EMPTY_LIST_JSON)
     limit = request.args.get("limit", 50, type=int)
     days = request.args.get("days", 0, type=int)
     since_days = days if days > 0 else None
@@ -754,12 +1051,9 @@ def api_insight_estimate():
         JSON with ``article_count``, ``estimated_cost``, ``model``,
         and for trend: ``n_quarters``, ``n_years``.
     """
-    from llm_client import get_model_name, has_api_key
-    from summarizer import estimate_insight_cost, estimate_trend_cost
-
     category = request.args.get("category", "").strip()
     if not category:
-        return jsonify({"error": "missing category parameter"}), 400
+        return _const_json(_MISSING_CATEGORY_JSON, 400)
 
     subcategory = request.args.get("subcategory", "").strip() or None
     days = request.args.get("days", 0, type=int)
@@ -793,6 +1087,29 @@ def api_insight_estimate():
         })
 
 
+def _cost_since(pre_tokens, model):
+    """Return the USD cost of tokens tracked since a ``cost_tracker.get_tokens()`` snapshot.
+
+    Args:
+        pre_tokens: The ``(input, cache_creation, cache_read, output)`` tuple
+            captured before the LLM work started.
+        model: Model name used for pricing.
+
+    Returns:
+        Cost in USD as a float.
+    """
+    post_it, post_cc, post_cr, post_ot = cost_tracker.get_tokens()
+    pre_it, pre_cc, pre_cr, pre_ot = pre_tokens
+    inp_price, cache_read_price, out_price = _lookup_pricing(model)
+    cache_write_price = inp_price * 1.25
+    return (
+        (post_it - pre_it)  * inp_price
+        + (post_cc - pre_cc) * cache_write_price
+        + (post_cr - pre_cr) * cache_read_price
+        + (post_ot - pre_ot) * out_price
+    ) / 1_000_000
+
+
 @app.route("/api/trend-analysis")
 def api_trend_analysis():
     """Generate or return cached quarterly and yearly trend analyses for a category.
@@ -805,11 +1122,9 @@ def api_trend_analysis():
         JSON with ``quarterly`` list, ``yearly`` list, ``model_used``,
         or an error object.
     """
-    from summarizer import generate_trend_analysis
-
     category = request.args.get("category", "").strip()
     if not category:
-        return jsonify({"error": "missing category parameter"}), 400
+        return _const_json(_MISSING_CATEGORY_JSON, 400)
 
     subcategory = request.args.get("subcategory", "").strip() or None
     days = request.args.get("days", 0, type=int)
@@ -819,25 +1134,41 @@ def api_trend_analysis():
     if len(articles) < 3:
         return jsonify({"error": "insufficient_data", "article_count": len(articles)})
 
-    pre_it, pre_cc, pre_cr, pre_ot = cost_tracker.get_tokens()
-    result = generate_trend_analysis(category, subcategory_tag=subcategory, since_days=since_days)
+    pre_tokens = cost_tracker.get_tokens()
+    result = generate_trend_analysis(
+        category, subcategory_tag=subcategory, since_days=since_days, articles=articles
+    )
     if result is None:
         return jsonify({"error": "generation_failed"}), 500
 
-    post_it, post_cc, post_cr, post_ot = cost_tracker.get_tokens()
-    inp_price, cache_read_price, out_price = _lookup_pricing(result["model_used"])
-    cache_write_price = inp_price * 1.25
-    actual_cost = (
-        (post_it - pre_it)  * inp_price
-        + (post_cc - pre_cc) * cache_write_price
-        + (post_cr - pre_cr) * cache_read_price
-        + (post_ot - pre_ot) * out_price
-    ) / 1_000_000
-    result["actual_cost"] = actual_cost
+    result["actual_cost"] = _cost_since(pre_tokens, result["model_used"])
 
     return jsonify(result)
 
 
+# Cached category insights are reused for this long if the article hash matches.
+_INSIGHT_CACHE_TTL_SECONDS = 24 * 3600
+
+# cache_key -> (summaries version, UTC date, article hash). While neither the
+# summaries nor (for day-windowed keys) the date have changed, the article set
+# is unchanged, so a fresh cached insight can be served without refetching
+# and rehashing the category's articles.
+_insight_hash_memo = {}
+
+
+def _cached_insight_response(cached):
+    """Build the ``/api/category-insight`` response for a cached insight row."""
+    return jsonify({
+        "trend": cached["trend_text"],
+        "forecast": cached["forecast_text"],
+        "article_count": cached["article_count"],
+        "model_used": cached["model_used"],
+        "cached": True,
+        "actual_cost": 0.0,
+        "generated_at": cached["created_date"],
+    })
+
+
 @app.route("/api/category-insight")
 def api_category_insight():
     """Return or generate a trend/forecast insight for a category.
@@ -854,12 +1185,9 @@ def api_category_insight():
         JSON with ``trend``, ``forecast``, ``article_count``,
         ``model_used``, ``cached`` boolean, and ``generated_at``.
     """
-    from datetime import datetime, timedelta
-    from summarizer import generate_category_insight
-
     category = request.args.get("category", "").strip()
     if not category:
-        return jsonify({"error": "missing category parameter"}), 400
+        return _const_json(_MISSING_CATEGORY_JSON, 400)
 
     subcategory = request.args.get("subcategory", "").strip() or None
     days = request.args.get("days", 0, type=int)
@@ -871,50 +1199,37 @@ def api_category_insight():
     if since_days:
         cache_key = f"{cache_key}::days{since_days}"
 
+    # Cache-first: skip loading and hashing articles when they are known
+    # not to have changed since the hash was last computed for this key.
+    memo_stamp = (get_summaries_version(), datetime.utcnow().date() if since_days else None)
+    memo = _insight_hash_memo.get(cache_key)
+    if memo is not None and memo[:2] == memo_stamp:
+        cached = get_fresh_category_insight(cache_key, memo[2], _INSIGHT_CACHE_TTL_SECONDS)
+        if cached:
+            return _cached_insight_response(cached)
+
     # Get articles for this category/subcategory and check minimum count
     articles = get_articles_for_category(category, subcategory_tag=subcategory, since_days=since_days)
     if len(articles) < 3:
         return jsonify({"error": "insufficient_data", "article_count": len(articles)})
 
     current_hash = _compute_category_hash(articles)
+    _insight_hash_memo[cache_key] = memo_stamp + (current_hash,)
 
     # Check cache
-    cached = get_category_insight(cache_key)
+    cached = get_fresh_category_insight(cache_key, current_hash, _INSIGHT_CACHE_TTL_SECONDS)
     if cached:
-        cache_age_ok = False
-        if cached["created_date"]:
-            try:
-                created = datetime.fromisoformat(cached["created_date"])
-                cache_age_ok = (datetime.utcnow() - created) < timedelta(hours=24)
-            except (ValueError, TypeError):
-                pass
-
-        if cached["article_hash"] == current_hash and cache_age_ok:
-            return jsonify({
-                "trend": cached["trend_text"],
-                "forecast": cached["forecast_text"],
-                "article_count": cached["article_count"],
-                "model_used": cached["model_used"],
-                "cached": True,
-                "actual_cost": 0.0,
-                "generated_at": cached["created_date"],
-            })
+        return _cached_insight_response(cached)
 
     # Generate fresh insight, snapshot tokens to compute actual cost
-    pre_it, pre_cc, pre_cr, pre_ot = cost_tracker.get_tokens()
-    result = generate_category_insight(category, subcategory_tag=subcategory, since_days=since_days)
+    pre_tokens = cost_tracker.get_tokens()
+    result = generate_category_insight(
+        category, subcategory_tag=subcategory, since_days=since_days, articles=articles
+    )
     if result is None:
         return jsonify({"error": "generation_failed"}), 500
 
-    post_it, post_cc, post_cr, post_ot = cost_tracker.get_tokens()
-    inp_price, cache_read_price, out_price = _lookup_pricing(result["model_used"])
-    cache_write_price = inp_price * 1.25
-    actual_cost = (
-        (post_it - pre_it)  * inp_price
-        + (post_cc - pre_cc) * cache_write_price
-        + (post_cr - pre_cr) * cache_read_price
-        + (post_ot - pre_ot) * out_price
-    ) / 1_000_000
+    actual_cost = _cost_since(pre_tokens, result["model_used"])
 
     # Save to cache
     save_category_insight(
@@ -949,8 +1264,7 @@ def api_intelligence_chat():
     Returns:
         JSON with ``response``, ``articles``, ``model_used``, ``error``.
     """
-    from intelligence import chat as intelligence_chat
-    data = request.get_json(silent=True) or {}
+    data = _json_body()
     messages = data.get("messages", [])
     if not messages:
         return jsonify({"error": "No messages provided"}), 400
@@ -976,48 +1290,75 @@ def api_intelligence_search():
     Returns:
         JSON with ``articles`` array and ``error`` field.
     """
-    from embeddings import semantic_search
-    data = request.get_json(silent=True) or {}
+    data = _json_body()
     query = data.get("query", "").strip()
     if not query:
-        return jsonify({"articles": [], "error": "No query provided"})
+        return _const_json(_NO_QUERY_JSON)
     top_k = min(data.get("top_k", 15), 50)
     articles = semantic_search(query, top_k=top_k)
     return jsonify({"articles": articles, "error": None})
 
 
+def _intelligence_status():
+    return {
+        **get_embedding_stats(),
+        "is_active": is_refreshing() or is_embedding_only(),
+    }
+
+
 @app.route("/api/intelligence/status")
 def api_intelligence_status():
     """Return embedding generation progress statistics.
 
     Returns:
-        JSON with ``total_summarized`` and ``total_embedded`` counts.
+        JSON with ``total_summarized`` and ``total_embedded`` counts, and
+        ``is_active`` (a refresh or embed job is running).
     """
-    stats = get_embedding_stats()
-    return jsonify(stats)
+    return jsonify(_intelligence_status())
+
+
+@app.route("/api/intelligence/status/stream")
+def api_intelligence_status_stream():
+    """Stream embedding progress statistics as Server-Sent Events.
+
+    Emits the ``/api/intelligence/status`` payload on connect and again
+    only after pipeline activity. The stream ends with the first payload
+    whose ``is_active`` is false, so it only holds a worker thread while
+    a refresh or embed job is running; clients open it when
+    ``/api/intelligence/status`` reports an active job.
+    """
+    return _sse_response(_intelligence_status, is_final=lambda p: not p["is_active"])
 
 
 # === Startup ===
 
-def find_free_port(start=5000):
+def find_free_port(start=5000, attempts=32, host="127.0.0.1"):
     """Find an available TCP port starting from the given port number.
 
-    Tries ``start``, ``start + 1``, and falls back to ``start + 2``.
+    Tries ``start`` through ``start + attempts - 1`` and returns the first
+    port that can be bound on ``host``. The probe deliberately does not set
+    ``SO_REUSEADDR``: on Windows that option lets ``bind()`` succeed on a
+    port another process is already listening on.
 
     Args:
         start: The first port number to try.
+        attempts: How many consecutive ports to try.
+        host: The address the server will bind to.
 
     Returns:
         An available port number.
+
+    Raises:
+        RuntimeError: If none of the candidate ports is free.
     """
-    for port in (start, start + 1):
+    for port in range(start, start + attempts):
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
             try:
-                s.bind(("127.0.0.1", port))
+                s.bind((host, port))
                 return port
             except OSError:
                 continue
-    return start + 2
+    raise RuntimeError(f"No free port in range {start}-{start + attempts - 1}")
 
 
 def open_browser(port):
@@ -1035,19 +1376,35 @@ if __name__ == "__main__":
     config = load_config()
 
     # Sync configured feeds into database
-    for feed in config.get("feeds", []):
-        upsert_source(feed["name"], feed["url"], feed.get("enabled", True))
+    upsert_sources(
+        [(f["name"], f["url"], f.get("enabled", True)) for f in config.get("feeds", [])]
+    )
 
     # Start background scheduler
     start_scheduler(app)
 
     host = os.environ.get("HOST", "127.0.0.1")
-    port = int(os.environ.get("PORT", 0)) or find_free_port()
+    port = int(os.environ.get("PORT", 0)) or find_free_port(host=host)
 
-    logging.info(f"Starting Threat Loom on http://{host}:{port}")
+    logger.info(f"Starting Threat Loom on http://{host}:{port}")
 
     # Only open browser for local development (not inside Docker)
     if host == "127.0.0.1":
         threading.Timer(1.5, open_browser, args=[port]).start()
 
-    app.run(host=host, port=port, debug=False)
+    try:
+        from waitress import serve
+    except ImportError:
+        logger.warning("waitress not installed; falling back to the Flask development server")
+        app.run(host=host, port=port, debug=False, threaded=True)
+    else:
+        # One thread per in-flight request; SSE status streams hold a
+        # thread each for as long as the dashboard is open.
+        serve(
+            app,
+            host=host,
+            port=port,
+            threads=int(os.environ.get("WEB_THREADS", "16") or 16),
+            connection_limit=200,
+            channel_timeout=120,
+        )
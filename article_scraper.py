@@ -1,40 +1,46 @@
 import logging
+import math
+import os
 import signal
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
-from urllib.parse import urlparse
+import threading
+import time
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    TimeoutError as FuturesTimeout,
+    as_completed,
+)
 
 import requests
 import trafilatura
 from trafilatura.settings import use_config as trafilatura_config
 
-from database import delete_article, get_unscraped_articles, update_article_content
+try:
+    from trafilatura.settings import Extractor
+except ImportError:  # trafilatura < 2.0
+    Extractor = None
+
+from database import (
+    delete_file_url_articles,
+    get_unscraped_articles,
+    update_article_cache_headers,
+    update_article_content,
+)
 
 logger = logging.getLogger(__name__)
 
+CONNECT_TIMEOUT = 5
 REQUEST_TIMEOUT = 20
 SCRAPE_PER_ARTICLE_TIMEOUT = 30
+MAX_HTML_BYTES = 5 * 1024 * 1024
+MAX_SCRAPE_WORKERS = 8
+EXTRACT_TIMEOUT = 15
+MIN_TEXT_LENGTH = 100
 
-_SKIP_EXTENSIONS = frozenset({
-    ".pdf", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx",
-    ".zip", ".rar", ".7z", ".gz", ".tar", ".tgz",
-    ".exe", ".msi", ".dmg", ".apk", ".iso",
-})
-
-
-def _is_file_url(url):
-    """Check whether a URL points to a downloadable file.
-
-    Args:
-        url: The URL string to inspect.
-
-    Returns:
-        True if the URL path ends with a known file extension.
-    """
-    try:
-        path = urlparse(url).path.lower()
-        return any(path.endswith(ext) for ext in _SKIP_EXTENSIONS)
-    except Exception:
-        return False
+# Number of worker processes for trafilatura extraction (0 = extract on the
+# fetching thread). Opt-in because each worker imports trafilatura/lxml and,
+# on spawn-based platforms (Windows, macOS), re-imports this module.
+EXTRACT_PROCESSES = int(os.environ.get("EXTRACT_PROCESSES", "0") or 0)
 
 # Full browser-like headers to avoid 403s from WAFs (Cloudflare, Akamai, etc.)
 HEADERS = {
@@ -55,86 +61,242 @@ HEADERS = {
     "Cache-Control": "max-age=0",
 }
 
-# Persistent session for cookie handling (needed for Cloudflare challenges)
+# Persistent session for cookie handling (needed for Cloudflare challenges).
+# The per-host connection pool is sized to the scrape pool so concurrent
+# fetches keep their keep-alive connections instead of discarding them.
 _session = requests.Session()
 _session.headers.update(HEADERS)
+_adapter = requests.adapters.HTTPAdapter(
+    pool_connections=MAX_SCRAPE_WORKERS * 2, pool_maxsize=MAX_SCRAPE_WORKERS
+)
+_session.mount("http://", _adapter)
+_session.mount("https://", _adapter)
+
+# Shared pool for the I/O-bound fetches of a scrape batch
+_scrape_pool = ThreadPoolExecutor(max_workers=MAX_SCRAPE_WORKERS, thread_name_prefix="scrape")
 
-# Configure trafilatura with generous timeouts
+# Configure trafilatura once: generous download timeout, and reject extracts
+# too short to be an article inside trafilatura itself.
 _traf_config = trafilatura_config()
 _traf_config.set("DEFAULT", "DOWNLOAD_TIMEOUT", str(REQUEST_TIMEOUT))
+_traf_config.set("DEFAULT", "MIN_OUTPUT_SIZE", str(MIN_TEXT_LENGTH + 1))
+
+# trafilatura >= 2.0 accepts prebuilt extraction options; older versions
+# rebuild them from the config on every call.
+_extract_options = (
+    Extractor(config=_traf_config, comments=False, tables=False)
+    if Extractor is not None else None
+)
+
+# Returned by _fetch_and_extract when the server answers 304 Not Modified
+NOT_MODIFIED = object()
+
+# IDs of articles whose scrape outlived its batch and is still running on
+# the scrape pool; later batches skip them so they are not fetched twice.
+_in_flight = set()
+_in_flight_lock = threading.Lock()
+
+_extract_pool = None
+_extract_pool_lock = threading.Lock()
+
+
+def _get_extract_pool():
+    """Return the shared extraction process pool, creating it on first use."""
+    global _extract_pool
+    with _extract_pool_lock:
+        if _extract_pool is None:
+            _extract_pool = ProcessPoolExecutor(max_workers=EXTRACT_PROCESSES)
+        return _extract_pool
+
+
+def _extract(html):
+    """Extract main text from HTML with the module's trafilatura settings."""
+    if _extract_options is not None:
+        return trafilatura.extract(html, options=_extract_options)
+    return trafilatura.extract(
+        html, config=_traf_config, include_comments=False, include_tables=False
+    )
+
+
+def _extract_text(html, timeout=EXTRACT_TIMEOUT):
+    """Run ``_extract`` in the process pool when enabled.
+
+    lxml parsing is CPU-bound and holds the GIL, so with several scrape
+    workers in-process extraction is effectively serialized. In-process
+    extraction cannot be interrupted; it is bounded by ``MAX_HTML_BYTES``.
+    """
+    if EXTRACT_PROCESSES > 0:
+        future = _get_extract_pool().submit(_extract, html)
+        return future.result(timeout=timeout)
+    return _extract(html)
 
 
-def _fetch_and_extract(url):
+def _fetch_and_extract(url, etag=None, last_modified=None):
     """Download and extract article text from a URL.
 
-    Runs inside a thread with a hard timeout. Tries the requests session
+    Runs on the shared scrape pool. Tries the requests session
     first (full browser headers + cookies), then falls back to
-    trafilatura's built-in fetcher.
+    trafilatura's built-in fetcher. Validators from an earlier attempt are
+    sent as a conditional GET, so an unchanged page costs a 304 instead of
+    a full download and extraction.
+
+    The whole call is held to ``SCRAPE_PER_ARTICLE_TIMEOUT``: the session
+    body is streamed against that deadline (and ``MAX_HTML_BYTES``), and
+    the fallback fetch and extraction are skipped once it has passed, so
+    one slow page cannot keep a scrape worker busy into later batches.
 
     Args:
         url: The article URL to fetch and extract text from.
+        etag: ``ETag`` stored from a previous 200 response, if any.
+        last_modified: ``Last-Modified`` stored from a previous 200
+            response, if any.
 
     Returns:
-        The extracted article text as a string, or None if fetching or
-        extraction fails or the result is too short (< 100 chars).
+        A ``(text, validators)`` tuple. ``text`` is the extracted article
+        text, ``NOT_MODIFIED`` if the server answered 304, or None if
+        fetching or extraction fails, runs out of time, or the result is
+        too short (<= ``MIN_TEXT_LENGTH`` chars). ``validators`` is the
+        ``(etag, last_modified)`` pair of a 200 response from the session
+        fetch, or None.
     """
+    deadline = time.monotonic() + SCRAPE_PER_ARTICLE_TIMEOUT
     html = None
+    validators = None
+
+    conditional = {}
+    if etag:
+        conditional["If-None-Match"] = etag
+    if last_modified:
+        conditional["If-Modified-Since"] = last_modified
 
-    # Attempt 1: requests session with full browser headers
+    # Attempt 1: requests session with full browser headers. The body is
+    # passed to trafilatura as bytes, which detects the encoding itself.
     try:
-        resp = _session.get(url, timeout=REQUEST_TIMEOUT, allow_redirects=True)
-        resp.raise_for_status()
-        html = resp.text
+        with _session.get(
+            url,
+            headers=conditional,
+            timeout=(CONNECT_TIMEOUT, REQUEST_TIMEOUT),
+            allow_redirects=True,
+            stream=True,
+        ) as resp:
+            if resp.status_code == 304:
+                return NOT_MODIFIED, None
+            resp.raise_for_status()
+            body = bytearray()
+            for chunk in resp.iter_content(chunk_size=16 * 1024):
+                body += chunk
+                if len(body) > MAX_HTML_BYTES:
+                    raise ValueError(f"page larger than {MAX_HTML_BYTES} bytes")
+                if time.monotonic() > deadline:
+                    raise TimeoutError("download exceeded the per-article timeout")
+            html = bytes(body)
+            new_etag = resp.headers.get("ETag")
+            new_last_modified = resp.headers.get("Last-Modified")
+            if new_etag or new_last_modified:
+                validators = (new_etag, new_last_modified)
     except Exception as e:
         logger.debug(f"Session fetch failed for {url}: {e}")
 
     # Attempt 2: trafilatura's native fetcher (different networking stack)
-    if not html:
+    if not html and time.monotonic() < deadline:
         try:
             html = trafilatura.fetch_url(url, config=_traf_config)
         except Exception as e:
             logger.debug(f"Trafilatura fetch failed for {url}: {e}")
 
-    if not html:
-        return None
+    remaining = deadline - time.monotonic()
+    if not html or remaining <= 0:
+        return None, validators
 
     # Extract article text from HTML
-    text = trafilatura.extract(html, include_comments=False, include_tables=False)
-    if text and len(text) > 100:
-        return text
+    text = _extract_text(html, timeout=min(EXTRACT_TIMEOUT, remaining))
+    if text and len(text) > MIN_TEXT_LENGTH:
+        return text, validators
 
-    return None
+    return None, validators
 
 
 def scrape_article(url):
-    """Extract full article text from a URL with a hard timeout.
+    """Extract full article text from a single URL on the calling thread.
 
-    Wraps ``_fetch_and_extract`` in a ``ThreadPoolExecutor`` to enforce
-    a per-article timeout of ``SCRAPE_PER_ARTICLE_TIMEOUT`` seconds.
+    Batch callers should use ``scrape_unscraped_articles``, which fetches
+    concurrently on the shared scrape pool.
 
     Args:
         url: The article URL to scrape.
 
     Returns:
-        The cleaned article text, or None if scraping times out or fails.
+        The cleaned article text, or None if scraping fails.
     """
-    with ThreadPoolExecutor(max_workers=1) as executor:
-        future = executor.submit(_fetch_and_extract, url)
-        try:
-            return future.result(timeout=SCRAPE_PER_ARTICLE_TIMEOUT)
-        except (FuturesTimeout, Exception) as e:
-            logger.warning(f"Scrape timed out or failed for {url}: {e}")
-            future.cancel()
-            return None
+    try:
+        text, _ = _fetch_and_extract(url)
+    except Exception as e:
+        logger.warning(f"Scrape failed for {url}: {e}")
+        return None
+    return text if text is not NOT_MODIFIED else None
+
+
+def _scrape_queued(article):
+    """Scrape one queued article row, sending its stored validators."""
+    try:
+        return _fetch_and_extract(article["url"], article["etag"], article["last_modified"])
+    except Exception as e:
+        logger.warning(f"Scrape failed for {article['url']}: {e}")
+        return None, None
+
+
+def _store_scrape_result(article_id, result):
+    """Persist one ``_scrape_queued`` result.
+
+    Returns:
+        True if article text was stored, False if the article was marked
+        failed.
+    """
+    content, validators = result
+    if validators:
+        update_article_cache_headers(article_id, *validators)
+    if content is NOT_MODIFIED:
+        # Manual retries clear the validators (see
+        # reset_scrape_failed_articles), so a 304 here means the
+        # page is unchanged since an attempt that stored nothing.
+        update_article_content(article_id, "")
+        logger.info(f"  Unchanged since last attempt (304) for article {article_id}")
+        return False
+    if content:
+        update_article_content(article_id, content)
+        logger.info(f"  Scraped {len(content)} chars for article {article_id}")
+        return True
+    # Mark as empty string so we don't retry indefinitely
+    update_article_content(article_id, "")
+    logger.warning(f"  Could not extract content for article {article_id}")
+    return False
+
+
+def _store_late_result(article_id, future):
+    """Done-callback for a scrape that outlived its batch."""
+    try:
+        _store_scrape_result(article_id, future.result())
+    except Exception as e:
+        logger.warning(f"  Late scrape result for article {article_id} not stored: {e}")
+    finally:
+        with _in_flight_lock:
+            _in_flight.discard(article_id)
 
 
 def scrape_unscraped_articles(limit=20, article_ids=None):
     """Batch-process articles that have no ``content_raw`` yet.
 
     Fetches up to ``limit`` unscraped articles from the database,
-    scrapes each one, and stores the result. Articles pointing to
-    file URLs are deleted instead of scraped. Articles that fail
-    extraction are marked with an empty string to prevent retries.
+    scrapes them concurrently on the shared scrape pool, and stores each
+    result as it completes. Unscraped articles pointing to file URLs are
+    deleted up front instead of scraped. Articles that fail extraction or
+    are unchanged since a previous failed attempt (HTTP 304) are marked
+    with an empty string to prevent retries.
+
+    Each scrape bounds itself (see ``_fetch_and_extract``); the batch wait
+    is only a backstop. Articles still queued when it expires are
+    cancelled and marked failed, while ones already running store their
+    result when they finish and are skipped by later batches meanwhile.
 
     Args:
         limit: Maximum number of articles to process in this batch.
@@ -143,30 +305,47 @@ def scrape_unscraped_articles(limit=20, article_ids=None):
     Returns:
         Total number of articles processed (scraped + failed + deleted).
     """
-    articles = get_unscraped_articles(limit=limit, article_ids=article_ids)
+    # File URLs are dropped in one statement and never enter the batch
+    deleted = delete_file_url_articles(unscraped_only=True)
+    if deleted:
+        logger.info(f"Removed {deleted} unscraped file-URL articles")
+
+    with _in_flight_lock:
+        busy = set(_in_flight)
+    articles = [
+        a for a in get_unscraped_articles(limit=limit + len(busy), article_ids=article_ids)
+        if a["id"] not in busy
+    ][:limit]
     scraped = 0
-    total = len(articles)
-
-    for i, article in enumerate(articles):
-        url = article["url"]
-        article_id = article["id"]
-
-        if _is_file_url(url):
-            logger.info(f"Skipping file URL, removing article {article_id}: {url}")
-            delete_article(article_id)
-            continue
-
-        logger.info(f"Scraping [{i+1}/{total}]: {url}")
-        content = scrape_article(url)
-
-        if content:
-            update_article_content(article_id, content)
-            scraped += 1
-            logger.info(f"  Scraped {len(content)} chars for article {article_id}")
-        else:
-            # Mark as empty string so we don't retry indefinitely
-            update_article_content(article_id, "")
-            logger.warning(f"  Could not extract content for article {article_id}")
-
-    logger.info(f"Scraped {scraped}/{total} articles")
+    total = len(articles) + deleted
+
+    futures = {}
+    for article in articles:
+        logger.info(f"Scraping: {article['url']}")
+        futures[_scrape_pool.submit(_scrape_queued, article)] = article["id"]
+
+    # Each worker handles ceil(n / workers) articles, each bounded by the
+    # per-article timeout; the slack covers scheduling and the DB writes.
+    rounds = math.ceil(len(futures) / MAX_SCRAPE_WORKERS) if futures else 0
+    pending = set(futures)
+    try:
+        for future in as_completed(futures, timeout=(SCRAPE_PER_ARTICLE_TIMEOUT + 5) * rounds):
+            pending.discard(future)
+            if _store_scrape_result(futures[future], future.result()):
+                scraped += 1
+    except FuturesTimeout:
+        for future in pending:
+            article_id = futures[future]
+            if future.cancel():
+                update_article_content(article_id, "")
+                logger.warning(f"  Scrape timed out in the queue for article {article_id}")
+            else:
+                with _in_flight_lock:
+                    _in_flight.add(article_id)
+                future.add_done_callback(
+                    lambda f, article_id=article_id: _store_late_result(article_id, f)
+                )
+                logger.warning(f"  Scrape still running for article {article_id}; storing it when done")
+
+    logger.info(f"Scraped {scraped}/{len(articles)} articles")
     return total
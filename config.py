@@ -1,6 +1,14 @@
+import copy
 import json
 import os
 import shutil
+import tempfile
+import threading
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
 
 # Load .env file if available (for local development)
 try:
@@ -26,6 +34,11 @@ for _fname in ("config.json", "threatlandscape.db"):
 CONFIG_PATH = os.path.join(DATA_DIR, "config.json")
 CONFIG_EXAMPLE_PATH = os.path.join(DATA_DIR, "config.json.example")
 
+# Parsed config keyed by the file's (mtime_ns, size); see load_config().
+_cfg_cache = {"stamp": None, "data": None}
+# Re-entrant: _cached_config holds it while _read_config may call save_config
+_cfg_lock = threading.RLock()
+
 
 def _load_example_feeds():
     """Return the feeds list from ``config.json.example``, or [] if missing."""
@@ -66,16 +79,17 @@ def get_default_config():
         "report_token": "",
         "dedup_enabled": True,
         "dedup_threshold": 0.85,
+        "chat_cache_similarity": None,
     }
 
 
-def load_config():
-    """Load configuration from ``config.json``, creating it with defaults if absent.
+def _read_config():
+    """Read ``config.json`` from disk, creating it with defaults if absent.
 
-    On every load, feeds from ``config.json.example`` are merged in by URL so
-    that new feeds added to the example are picked up by existing installations,
-    and any default keys missing from an older ``config.json`` are backfilled so
-    the Settings UI always reflects current defaults.
+    Feeds from ``config.json.example`` are merged in by URL so that new feeds
+    added to the example are picked up by existing installations, and any
+    default keys missing from an older ``config.json`` are backfilled so the
+    Settings UI always reflects current defaults.
 
     Returns:
         dict: The parsed configuration dictionary.
@@ -84,8 +98,9 @@ def load_config():
         config = get_default_config()
         save_config(config)
     else:
-        with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-            config = json.load(f)
+        with open(CONFIG_PATH, "rb") as f:
+            raw = f.read()
+        config = orjson.loads(raw) if orjson is not None else json.loads(raw)
 
         dirty = False
 
@@ -112,11 +127,102 @@ def load_config():
     return config
 
 
+def _cached_config():
+    """Return the cached configuration dict, re-reading it if the file changed.
+
+    The file is ``stat``-ed on every call and only re-read (see
+    ``_read_config``) when its mtime or size changes. The returned dict is
+    the shared cache entry and must not be mutated; callers hand out copies.
+    Must be called with ``_cfg_lock`` held.
+    """
+    try:
+        st = os.stat(CONFIG_PATH)
+        stamp = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        stamp = None
+    if stamp is None or stamp != _cfg_cache["stamp"]:
+        _cfg_cache["data"] = _read_config()
+        try:
+            st = os.stat(CONFIG_PATH)
+            _cfg_cache["stamp"] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            _cfg_cache["stamp"] = None
+    return _cfg_cache["data"]
+
+
+def load_config():
+    """Load configuration from ``config.json``, creating it with defaults if absent.
+
+    The parsed file is cached (see ``_cached_config``), so the many
+    per-request and per-LLM-call lookups cost one syscall. Callers receive
+    a deep copy and may mutate it freely (e.g. before ``save_config``).
+
+    Returns:
+        dict: The parsed configuration dictionary.
+    """
+    with _cfg_lock:
+        return copy.deepcopy(_cached_config())
+
+
+def get_config_value(key, default=None):
+    """Return a single configuration value without copying the whole config.
+
+    For hot paths that read one setting (API keys, model names): only the
+    requested value is copied, not the feed list and the rest of the file.
+
+    Args:
+        key: Top-level configuration key.
+        default: Value returned when the key is absent.
+
+    Returns:
+        A deep copy of the value, or ``default``.
+    """
+    with _cfg_lock:
+        return copy.deepcopy(_cached_config().get(key, default))
+
+
 def save_config(config):
     """Write the configuration dictionary to ``config.json``.
 
+    The file is written to a temporary sibling, fsync'd, and moved into
+    place with ``os.replace`` (the directory entry is fsync'd too where the
+    platform allows), so neither a crash mid-write nor a power loss right
+    after it leaves a truncated config.
+
     Args:
         config: The configuration dictionary to persist.
     """
-    with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-        json.dump(config, f, indent=2, ensure_ascii=False)
+    if orjson is not None:
+        data = orjson.dumps(config, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    else:
+        data = json.dumps(config, indent=2, ensure_ascii=False).encode("utf-8")
+    fd, tmp_path = tempfile.mkstemp(dir=DATA_DIR, prefix=".config-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, CONFIG_PATH)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    _fsync_dir(DATA_DIR)
+    with _cfg_lock:
+        _cfg_cache["stamp"] = None
+
+
+def _fsync_dir(path):
+    """Flush a directory entry to disk; a no-op where unsupported (Windows)."""
+    try:
+        dir_fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
@@ -1,6 +1,8 @@
 """Thread-safe LLM cost tracking with per-model pricing."""
 
 import threading
+from collections import deque
+from functools import lru_cache
 
 # Pricing per 1M tokens: (input, cache_read_input, output)
 # Anthropic cache writes: billed at 1.25× input (5-min TTL) or 2× input (1-hour TTL).
@@ -16,11 +18,26 @@ _PRICING = {
 }
 
 
+# Pricing keys ordered longest-first so the most-specific key wins.
+_PRICING_BY_SPECIFICITY = tuple(sorted(_PRICING.items(), key=lambda x: -len(x[0])))
+
+
+@lru_cache(maxsize=64)
 def _lookup_pricing(model):
-    """Return (input_price, cache_read_price, output_price) per 1M tokens for a model."""
+    """Return (input_price, cache_read_price, output_price) per 1M tokens for a model.
+
+    Tries an exact key, then a key that prefixes the model name (e.g. dated
+    snapshots like ``claude-haiku-4-5-20251001``), then any key contained in
+    the name.
+    """
     m = model.lower()
-    # Sort by key length descending so the most-specific key wins.
-    for key, prices in sorted(_PRICING.items(), key=lambda x: -len(x[0])):
+    prices = _PRICING.get(m)
+    if prices is not None:
+        return prices
+    for key, prices in _PRICING_BY_SPECIFICITY:
+        if m.startswith(key):
+            return prices
+    for key, prices in _PRICING_BY_SPECIFICITY:
         if key in m:
             return prices
     return (1.00, 0.10, 3.00)  # conservative fallback
@@ -39,48 +56,71 @@ class CostTracker:
         output_tokens          — generated output tokens
     """
 
+    # Samples kept before they are folded into the running totals, so a
+    # long-running server holds a bounded number of them.
+    FOLD_THRESHOLD = 4096
+
     def __init__(self):
+        # One (input, output, cache_creation, cache_read) sample per LLM call.
+        # deque.append is atomic in CPython, so workers never block on a
+        # lock; totals are summed lazily when read. The lock only guards
+        # folding old samples into _folded against reads and resets.
+        self._events = deque()
+        self._folded = (0, 0, 0, 0)
         self._lock = threading.Lock()
-        self._input_tokens = 0
-        self._cache_creation_tokens = 0
-        self._cache_read_tokens = 0
-        self._output_tokens = 0
 
     def add_tokens(self, input_tokens, output_tokens,
                    cache_creation_tokens=0, cache_read_tokens=0):
+        self._events.append(
+            (input_tokens, output_tokens, cache_creation_tokens, cache_read_tokens)
+        )
+        if len(self._events) > self.FOLD_THRESHOLD:
+            self._fold()
+
+    def _fold(self):
+        """Move the buffered samples into the running totals."""
         with self._lock:
-            self._input_tokens += input_tokens
-            self._cache_creation_tokens += cache_creation_tokens
-            self._cache_read_tokens += cache_read_tokens
-            self._output_tokens += output_tokens
+            inp, out, cc, cr = self._folded
+            for _ in range(len(self._events)):
+                i, o, c, r = self._events.popleft()
+                inp += i
+                out += o
+                cc += c
+                cr += r
+            self._folded = (inp, out, cc, cr)
 
     def reset(self):
         with self._lock:
-            self._input_tokens = 0
-            self._cache_creation_tokens = 0
-            self._cache_read_tokens = 0
-            self._output_tokens = 0
+            self._events.clear()
+            self._folded = (0, 0, 0, 0)
+
+    def _totals(self):
+        """Return summed (input, output, cache_creation, cache_read) counts."""
+        with self._lock:
+            inp, out, cc, cr = self._folded
+            events = tuple(self._events)
+        for i, o, c, r in events:
+            inp += i
+            out += o
+            cc += c
+            cr += r
+        return inp, out, cc, cr
 
     def get_session_cost(self, model):
         inp_price, cache_read_price, out_price = _lookup_pricing(model)
         cache_write_price = inp_price * 1.25  # conservative: 5-min TTL multiplier
-        with self._lock:
-            return (
-                self._input_tokens            * inp_price
-                + self._cache_creation_tokens * cache_write_price
-                + self._cache_read_tokens     * cache_read_price
-                + self._output_tokens         * out_price
-            ) / 1_000_000
+        inp, out, cc, cr = self._totals()
+        return (
+            inp  * inp_price
+            + cc * cache_write_price
+            + cr * cache_read_price
+            + out * out_price
+        ) / 1_000_000
 
     def get_tokens(self):
         """Return (input, cache_creation, cache_read, output) token counts."""
-        with self._lock:
-            return (
-                self._input_tokens,
-                self._cache_creation_tokens,
-                self._cache_read_tokens,
-                self._output_tokens,
-            )
+        inp, out, cc, cr = self._totals()
+        return inp, cc, cr, out
 
     @staticmethod
     def estimate_summarization_cost(article_count, model):
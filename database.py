@@ -1,40 +1,248 @@
+import atexit
 import hashlib
 import json as _json
+import logging
 import re
 import sqlite3
 import os
 import threading
+from array import array
+from contextlib import contextmanager
+from functools import lru_cache
 
 from config import DATA_DIR
 from mitre_data import KNOWN_THREAT_ACTORS, KNOWN_SOFTWARE
 
+try:
+    import sqlite_vec
+except ImportError:  # pragma: no cover - optional in-engine vector search
+    sqlite_vec = None
+
+logger = logging.getLogger(__name__)
+
 DB_PATH = os.path.join(DATA_DIR, "threatlandscape.db")
 
 _local = threading.local()
 
+# Serializes batch() transactions across threads, so concurrent batch
+# writers queue here instead of polling SQLite's busy handler.
+_write_lock = threading.Lock()
+
+# Downloadable-file URLs (PDF, DOC, ZIP, etc.) that cannot be meaningfully
+# scraped. Exposed to SQL as ``is_file_url(url)`` on every connection. A
+# trailing ``;params`` on the last segment is ignored, as ``urlparse`` does.
+_FILE_URL_RE = re.compile(
+    r"\.(?:pdf|docx?|xlsx?|pptx?|zip|rar|7z|gz|tar|tgz|exe|msi|dmg|apk|iso)(?:;[^/]*)?$",
+    re.IGNORECASE,
+)
+
+
+def is_file_url(url):
+    """Return True if the URL path ends with a known file extension.
+
+    The path is cut out with plain string splits (query, fragment, then
+    ``scheme://host``) rather than ``urlparse``; this runs for every feed
+    entry and as a SQL function over whole tables.
+
+    Args:
+        url: The URL string to inspect.
+
+    Returns:
+        bool: True if the URL points to a downloadable file.
+    """
+    try:
+        path = url.split("#", 1)[0].split("?", 1)[0]
+        scheme_end = path.find("://")
+        if scheme_end != -1:
+            slash = path.find("/", scheme_end + 3)
+            if slash == -1:
+                return False
+            path = path[slash:]
+        return _FILE_URL_RE.search(path) is not None
+    except Exception:
+        return False
+
+
+# Bumped on every write to the ``sources`` table so callers can cache
+# derived views (e.g. the settings page's URL -> source map).
+_sources_version = 0
+_sources_version_lock = threading.Lock()
+
+
+def _bump_sources_version():
+    global _sources_version
+    with _sources_version_lock:
+        _sources_version += 1
+
+
+def get_sources_version():
+    """Return a counter that changes whenever the ``sources`` table is written."""
+    return _sources_version
+
+
+# Set by init_db() once the articles_fts search index is available.
+_fts_enabled = False
+
+# Set by init_db() once the sqlite-vec article_vec index is available.
+_vec_enabled = False
+VECTOR_DIMS = 1536
+
+# Bumped whenever summaries are written or summarized articles are removed,
+# i.e. whenever the input to ``get_articles_for_category`` may have changed.
+_summaries_version = 0
+_summaries_version_lock = threading.Lock()
+
+
+def _bump_summaries_version():
+    global _summaries_version
+    with _summaries_version_lock:
+        _summaries_version += 1
+
+
+def get_summaries_version():
+    """Return a counter that changes whenever summarized articles change."""
+    return _summaries_version
+
 
 def get_connection():
     """Get or create a thread-local SQLite database connection.
 
     Each thread receives its own connection with WAL journal mode and
     foreign keys enabled. Connections are cached in thread-local storage.
+    ``synchronous=NORMAL`` is durable under WAL except for the last
+    transactions before a power loss, and drops the fsync from every commit.
+    Implicit write transactions open with ``BEGIN IMMEDIATE``: a deferred
+    transaction that reads first and then writes fails with ``SQLITE_BUSY``
+    (without waiting) if another writer committed in between.
 
     Returns:
         A ``sqlite3.Connection`` with ``Row`` row factory.
     """
     if not hasattr(_local, "conn") or _local.conn is None:
-        _local.conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+        # Statement cache sized above the default so the variable-length
+        # ``IN (?, ?, ...)`` queries don't evict the fixed hot-path statements.
+        _local.conn = sqlite3.connect(
+            DB_PATH, check_same_thread=False, cached_statements=256,
+            isolation_level="IMMEDIATE",
+        )
         _local.conn.row_factory = sqlite3.Row
         _local.conn.execute("PRAGMA journal_mode=WAL")
         _local.conn.execute("PRAGMA foreign_keys=ON")
+        _local.conn.execute("PRAGMA synchronous=NORMAL")
+        _local.conn.execute("PRAGMA temp_store=MEMORY")
+        _local.conn.execute("PRAGMA mmap_size=268435456")   # 256 MiB
+        _local.conn.execute("PRAGMA cache_size=-65536")     # 64 MiB
+        _local.conn.execute("PRAGMA busy_timeout=5000")
+        _local.conn.create_function("is_file_url", 1, is_file_url, deterministic=True)
+        _local.conn.create_function("tag_category", 1, _tag_to_category, deterministic=True)
+        _load_vector_extension(_local.conn)
     return _local.conn
 
 
+def _load_vector_extension(conn):
+    """Load the sqlite-vec extension into *conn* if it is installed."""
+    if sqlite_vec is None:
+        return
+    try:
+        conn.enable_load_extension(True)
+        sqlite_vec.load(conn)
+        conn.enable_load_extension(False)
+    except (AttributeError, sqlite3.Error) as e:
+        # AttributeError: Python built without extension loading
+        logger.debug(f"sqlite-vec not loaded: {e}")
+
+
+def get_reader():
+    """Get or create a thread-local read-only SQLite connection.
+
+    Dashboard and API reads go through this connection so they never take
+    part in a write transaction: under WAL a reader sees the last committed
+    snapshot and never waits on, or holds up, the ingest writers. Callers
+    that must see their own uncommitted writes (inside ``batch()``) use
+    ``get_connection()`` instead.
+
+    Returns:
+        A read-only ``sqlite3.Connection`` with ``Row`` row factory.
+    """
+    if getattr(_local, "reader", None) is None:
+        reader = sqlite3.connect(
+            f"file:{DB_PATH}?mode=ro", uri=True,
+            check_same_thread=False, cached_statements=256,
+        )
+        reader.row_factory = sqlite3.Row
+        reader.execute("PRAGMA query_only=ON")
+        reader.execute("PRAGMA temp_store=MEMORY")
+        reader.execute("PRAGMA mmap_size=268435456")   # 256 MiB
+        reader.execute("PRAGMA cache_size=-65536")     # 64 MiB
+        reader.execute("PRAGMA busy_timeout=5000")
+        reader.create_function("is_file_url", 1, is_file_url, deterministic=True)
+        _load_vector_extension(reader)
+        _local.reader = reader
+    return _local.reader
+
+
+def _commit(conn, *on_commit):
+    """Commit a helper's write, or defer it to the enclosing ``batch()``.
+
+    Args:
+        conn: The thread's connection.
+        *on_commit: Callables to run once the write is committed (e.g.
+            version bumps), so readers never cache pre-commit state.
+    """
+    if getattr(_local, "batch_depth", 0):
+        _local.batch_callbacks.extend(on_commit)
+        return
+    conn.commit()
+    for fn in on_commit:
+        fn()
+
+
+@contextmanager
+def batch():
+    """Group this thread's writes into a single transaction.
+
+    Write helpers called inside the block skip their per-row commit, so N
+    inserts cost one fsync instead of N. Nested blocks join the outermost
+    transaction. Rolls back if the block raises. Keep network calls outside
+    the block: it holds SQLite's write lock, and ``_write_lock``, until it
+    exits.
+
+    Yields:
+        The thread's ``sqlite3.Connection``.
+    """
+    conn = get_connection()
+    if getattr(_local, "batch_depth", 0):
+        _local.batch_depth += 1
+        try:
+            yield conn
+        finally:
+            _local.batch_depth -= 1
+        return
+
+    if conn.in_transaction:
+        conn.commit()
+    with _write_lock:
+        conn.execute("BEGIN IMMEDIATE")
+        _local.batch_depth = 1
+        _local.batch_callbacks = []
+        try:
+            yield conn
+        except BaseException:
+            _local.batch_depth = 0
+            conn.rollback()
+            raise
+        _local.batch_depth = 0
+        conn.commit()
+    for fn in dict.fromkeys(_local.batch_callbacks):
+        fn()
+
+
 def init_db():
     """Initialize the database schema.
 
     Creates all tables and indexes if they do not already exist:
-    ``sources``, ``articles``, ``summaries``, ``article_correlations``,
+    ``sources``, ``articles``, ``article_contents``, ``summaries``,
+    ``article_correlations``,
     ``category_insights``, ``article_embeddings``, and
     ``article_dedup_embeddings``.
     """
@@ -45,7 +253,9 @@ def init_db():
             name TEXT NOT NULL,
             url TEXT NOT NULL UNIQUE,
             enabled INTEGER DEFAULT 1,
-            last_fetched TIMESTAMP
+            last_fetched TIMESTAMP,
+            etag TEXT,
+            last_modified TEXT
         );
 
         CREATE TABLE IF NOT EXISTS articles (
@@ -56,11 +266,18 @@ def init_db():
             author TEXT,
             published_date TIMESTAMP,
             fetched_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            content_raw TEXT,
             image_url TEXT,
+            etag TEXT,
+            last_modified TEXT,
             FOREIGN KEY (source_id) REFERENCES sources(id)
         );
 
+        CREATE TABLE IF NOT EXISTS article_contents (
+            article_id INTEGER PRIMARY KEY,
+            content_raw TEXT NOT NULL,
+            FOREIGN KEY (article_id) REFERENCES articles(id)
+        );
+
         CREATE TABLE IF NOT EXISTS summaries (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             article_id INTEGER NOT NULL UNIQUE,
@@ -94,7 +311,8 @@ def init_db():
             article_count INTEGER,
             article_hash TEXT,
             model_used TEXT,
-            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            created_ts INTEGER
         );
 
         CREATE TABLE IF NOT EXISTS trend_analyses (
@@ -137,7 +355,13 @@ def init_db():
         CREATE INDEX IF NOT EXISTS idx_articles_url ON articles(url);
         CREATE INDEX IF NOT EXISTS idx_articles_source ON articles(source_id);
         CREATE INDEX IF NOT EXISTS idx_articles_published ON articles(published_date DESC);
-        CREATE INDEX IF NOT EXISTS idx_summaries_article ON summaries(article_id);
+        CREATE INDEX IF NOT EXISTS idx_articles_fetched ON articles(fetched_date DESC);
+        -- Matches the listing ORDER BY (NULLS LAST spelled as an IS NULL key)
+        -- so pages are read in index order instead of sorted per request.
+        CREATE INDEX IF NOT EXISTS idx_articles_listing
+            ON articles(published_date IS NULL, published_date DESC, fetched_date DESC);
+        CREATE INDEX IF NOT EXISTS idx_article_contents_failed
+            ON article_contents(article_id) WHERE content_raw = '';
     """)
     conn.commit()
 
@@ -145,6 +369,11 @@ def init_db():
     for col_sql in [
         "ALTER TABLE summaries ADD COLUMN network_traffic_reason TEXT",
         "ALTER TABLE articles ADD COLUMN duplicate_of_id INTEGER",
+        "ALTER TABLE category_insights ADD COLUMN created_ts INTEGER",
+        "ALTER TABLE articles ADD COLUMN etag TEXT",
+        "ALTER TABLE articles ADD COLUMN last_modified TEXT",
+        "ALTER TABLE sources ADD COLUMN etag TEXT",
+        "ALTER TABLE sources ADD COLUMN last_modified TEXT",
     ]:
         try:
             conn.execute(col_sql)
@@ -152,6 +381,267 @@ def init_db():
         except Exception:
             pass  # Column already exists
 
+    # These reference migrated columns (duplicate_of_id), so they come after
+    conn.executescript("""
+        CREATE INDEX IF NOT EXISTS idx_article_correlations_1
+            ON article_correlations(article_id_1);
+        CREATE INDEX IF NOT EXISTS idx_article_correlations_2
+            ON article_correlations(article_id_2);
+        CREATE INDEX IF NOT EXISTS idx_articles_duplicate_of
+            ON articles(duplicate_of_id) WHERE duplicate_of_id IS NOT NULL;
+
+        -- Deleting an article removes everything that references it, so
+        -- callers issue a single DELETE FROM articles. BEFORE DELETE clears
+        -- the children ahead of the foreign-key check on the parent row.
+        CREATE TRIGGER IF NOT EXISTS articles_delete_cascade
+        BEFORE DELETE ON articles BEGIN
+            DELETE FROM article_embeddings WHERE article_id = OLD.id;
+            DELETE FROM article_dedup_embeddings WHERE article_id = OLD.id;
+            DELETE FROM article_contents WHERE article_id = OLD.id;
+            DELETE FROM summaries WHERE article_id = OLD.id;
+            DELETE FROM article_correlations
+                WHERE article_id_1 = OLD.id OR article_id_2 = OLD.id;
+            UPDATE articles SET duplicate_of_id = NULL WHERE duplicate_of_id = OLD.id;
+        END;
+    """)
+
+    # Scraped text used to live inline in articles.content_raw, bloating every
+    # articles page; move it to article_contents and drop the column.
+    article_cols = {r[1] for r in conn.execute("PRAGMA table_info(articles)")}
+    if "content_raw" in article_cols:
+        conn.execute("DROP INDEX IF EXISTS idx_articles_unscraped")
+        conn.execute("DROP INDEX IF EXISTS idx_articles_scrape_failed")
+        conn.execute(
+            "INSERT OR IGNORE INTO article_contents (article_id, content_raw) "
+            "SELECT id, content_raw FROM articles WHERE content_raw IS NOT NULL"
+        )
+        try:
+            conn.execute("ALTER TABLE articles DROP COLUMN content_raw")
+        except sqlite3.OperationalError:
+            # SQLite < 3.35 cannot drop columns; release the text instead
+            conn.execute("UPDATE articles SET content_raw = NULL WHERE content_raw IS NOT NULL")
+        conn.commit()
+
+    # summaries.article_id is UNIQUE, whose implicit index already serves
+    # every lookup; the explicit copy only doubled the write cost.
+    conn.execute("DROP INDEX IF EXISTS idx_summaries_article")
+    conn.commit()
+
+    # Backfill epoch timestamps for insights cached before created_ts existed
+    conn.execute(
+        "UPDATE category_insights SET created_ts = CAST(strftime('%s', created_date) AS INTEGER) "
+        "WHERE created_ts IS NULL AND created_date IS NOT NULL"
+    )
+    conn.commit()
+
+    # Normalized (article_id, tag, category) rows for indexed tag and
+    # category filtering, kept in sync with summaries.tags by triggers so
+    # every writer stays consistent. ``category`` is ``_tag_to_category(tag)``
+    # via the ``tag_category`` SQL function registered on write connections.
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS article_tags (
+            article_id INTEGER NOT NULL,
+            tag TEXT NOT NULL COLLATE NOCASE,
+            category TEXT,
+            PRIMARY KEY (article_id, tag)
+        ) WITHOUT ROWID;
+    """)
+    tag_cols = {r[1] for r in conn.execute("PRAGMA table_info(article_tags)")}
+    if "category" not in tag_cols:
+        conn.executescript("""
+            ALTER TABLE article_tags ADD COLUMN category TEXT;
+            DROP TRIGGER IF EXISTS summaries_tags_insert;
+            DROP TRIGGER IF EXISTS summaries_tags_update;
+        """)
+    conn.executescript("""
+        CREATE INDEX IF NOT EXISTS idx_article_tags_tag ON article_tags(tag, article_id);
+        CREATE INDEX IF NOT EXISTS idx_article_tags_category
+            ON article_tags(category, article_id) WHERE category IS NOT NULL;
+
+        CREATE TRIGGER IF NOT EXISTS summaries_tags_insert AFTER INSERT ON summaries BEGIN
+            INSERT OR IGNORE INTO article_tags (article_id, tag, category)
+            SELECT NEW.article_id, value, tag_category(value)
+            FROM json_each(CASE WHEN json_valid(NEW.tags) THEN NEW.tags ELSE '[]' END)
+            WHERE type = 'text';
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS summaries_tags_update AFTER UPDATE OF tags ON summaries BEGIN
+            DELETE FROM article_tags WHERE article_id = OLD.article_id;
+            INSERT OR IGNORE INTO article_tags (article_id, tag, category)
+            SELECT NEW.article_id, value, tag_category(value)
+            FROM json_each(CASE WHEN json_valid(NEW.tags) THEN NEW.tags ELSE '[]' END)
+            WHERE type = 'text';
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS summaries_tags_delete AFTER DELETE ON summaries BEGIN
+            DELETE FROM article_tags WHERE article_id = OLD.article_id;
+        END;
+    """)
+
+    # Backfill tags for summaries written before article_tags existed
+    if conn.execute("SELECT 1 FROM article_tags LIMIT 1").fetchone() is None:
+        conn.execute(
+            "INSERT OR IGNORE INTO article_tags (article_id, tag, category) "
+            "SELECT sm.article_id, j.value, tag_category(j.value) FROM summaries sm, "
+            "json_each(CASE WHEN json_valid(sm.tags) THEN sm.tags ELSE '[]' END) j "
+            "WHERE j.type = 'text'"
+        )
+        conn.commit()
+
+    # Re-derive categories so edits to _CATEGORY_RULES apply to stored tags
+    conn.execute(
+        "UPDATE article_tags SET category = tag_category(tag) "
+        "WHERE category IS NOT tag_category(tag)"
+    )
+    conn.commit()
+
+    _init_search_index(conn)
+    _normalize_embeddings(conn)
+    _init_vector_index(conn)
+
+
+def _init_search_index(conn):
+    """Create and backfill the ``articles_fts`` search index if supported.
+
+    Uses FTS5's trigram tokenizer so a quoted-phrase MATCH behaves like the
+    case-insensitive substring ``LIKE`` search it replaces, but reads only
+    matching postings. Older SQLite builds without FTS5 or trigram support
+    keep the ``LIKE`` fallback in ``iter_articles``.
+    """
+    global _fts_enabled
+    try:
+        conn.executescript("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts
+                USING fts5(title, summary_text, tags, tokenize='trigram');
+
+            CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+                INSERT INTO articles_fts (rowid, title) VALUES (NEW.id, NEW.title);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS articles_fts_title AFTER UPDATE OF title ON articles BEGIN
+                UPDATE articles_fts SET title = NEW.title WHERE rowid = NEW.id;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+                DELETE FROM articles_fts WHERE rowid = OLD.id;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS summaries_fts_insert AFTER INSERT ON summaries BEGIN
+                UPDATE articles_fts SET summary_text = NEW.summary_text, tags = NEW.tags
+                WHERE rowid = NEW.article_id;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS summaries_fts_update
+            AFTER UPDATE OF summary_text, tags ON summaries BEGIN
+                UPDATE articles_fts SET summary_text = NEW.summary_text, tags = NEW.tags
+                WHERE rowid = NEW.article_id;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS summaries_fts_delete AFTER DELETE ON summaries BEGIN
+                UPDATE articles_fts SET summary_text = NULL, tags = NULL
+                WHERE rowid = OLD.article_id;
+            END;
+        """)
+    except sqlite3.OperationalError as e:
+        logger.info(f"FTS5 trigram search unavailable, using LIKE search: {e}")
+        _fts_enabled = False
+        return
+
+    # Backfill articles ingested before the index existed
+    if conn.execute("SELECT 1 FROM articles_fts LIMIT 1").fetchone() is None:
+        conn.execute(
+            "INSERT INTO articles_fts (rowid, title, summary_text, tags) "
+            "SELECT a.id, a.title, sm.summary_text, sm.tags "
+            "FROM articles a LEFT JOIN summaries sm ON sm.article_id = a.id"
+        )
+        conn.commit()
+    _fts_enabled = True
+
+
+def _normalize_embeddings(conn):
+    """Re-encode embeddings stored before vectors were L2-normalised on write.
+
+    Only BLOBs lacking the ``_Q8U_MAGIC`` tag are touched, so once every row
+    is converted this is a single prefix scan per table.
+    """
+    stale = "SELECT rowid, embedding FROM {} WHERE substr(embedding, 1, 4) != ?"
+    for table in ("article_embeddings", "article_dedup_embeddings"):
+        rows = conn.execute(stale.format(table), (_Q8U_MAGIC,)).fetchall()
+        if not rows:
+            continue
+        conn.executemany(
+            f"UPDATE {table} SET embedding = ? WHERE rowid = ?",
+            [(encode_embedding(decode_embedding(blob)), rowid) for rowid, blob in rows],
+        )
+        conn.commit()
+        logger.info(f"Normalised {len(rows)} stored vectors in {table}")
+
+
+def _init_vector_index(conn):
+    """Create and reconcile the sqlite-vec ``article_vec`` index if available.
+
+    ``article_vec`` mirrors ``article_embeddings`` as float32 vectors so
+    ``nearest_articles`` can run the cosine KNN inside SQLite, with each
+    article's publication day as a metadata column for the time filter.
+    Inserts are mirrored by ``save_embedding`` (the stored BLOBs are
+    quantized, which SQL cannot decode); deletes by a trigger. Without the
+    extension the trigger is dropped and ``semantic_search`` scores in numpy.
+    """
+    global _vec_enabled
+    try:
+        # Indexes built before the publication-day column are rebuilt below
+        try:
+            conn.execute("SELECT published_day FROM article_vec LIMIT 0")
+        except sqlite3.OperationalError as e:
+            if "no such column" in str(e):
+                conn.execute("DROP TABLE article_vec")
+        conn.executescript(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS article_vec USING vec0(
+                article_id INTEGER PRIMARY KEY,
+                embedding float[{VECTOR_DIMS}] distance_metric=cosine,
+                published_day text
+            );
+
+            CREATE TRIGGER IF NOT EXISTS article_vec_delete
+            AFTER DELETE ON article_embeddings BEGIN
+                DELETE FROM article_vec WHERE article_id = OLD.article_id;
+            END;
+        """)
+    except sqlite3.OperationalError as e:
+        logger.info(f"sqlite-vec unavailable, semantic search scores in numpy: {e}")
+        # The trigger would fail every embedding delete without the module
+        conn.execute("DROP TRIGGER IF EXISTS article_vec_delete")
+        conn.commit()
+        _vec_enabled = False
+        return
+
+    # Reconcile with embeddings written or deleted while the index was off
+    indexed = {r[0] for r in conn.execute("SELECT article_id FROM article_vec")}
+    stored = {r[0] for r in conn.execute("SELECT article_id FROM article_embeddings")}
+    for article_id in indexed - stored:
+        conn.execute("DELETE FROM article_vec WHERE article_id = ?", (article_id,))
+    for article_id in stored - indexed:
+        row = conn.execute(
+            "SELECT embedding FROM article_embeddings WHERE article_id = ?", (article_id,)
+        ).fetchone()
+        _index_vector(conn, article_id, row[0])
+    conn.commit()
+    _vec_enabled = True
+
+
+def _index_vector(conn, article_id, embedding_bytes):
+    """Write one embedding BLOB into ``article_vec``, replacing any old row."""
+    vec = decode_embedding(embedding_bytes)
+    if vec.shape[0] != VECTOR_DIMS:
+        return
+    conn.execute("DELETE FROM article_vec WHERE article_id = ?", (article_id,))
+    conn.execute(
+        "INSERT INTO article_vec (article_id, embedding, published_day) "
+        "SELECT id, ?, COALESCE(date(COALESCE(published_date, fetched_date)), '') "
+        "FROM articles WHERE id = ?",
+        (vec.tobytes(), article_id),
+    )
+
 
 def upsert_source(name, url, enabled=True):
     """Insert a source or update it if the URL already exists.
@@ -171,10 +661,27 @@ def upsert_source(name, url, enabled=True):
         (name, url, int(enabled)),
     )
     conn.commit()
+    _bump_sources_version()
     row = conn.execute("SELECT id FROM sources WHERE url = ?", (url,)).fetchone()
     return row["id"]
 
 
+def upsert_sources(rows):
+    """Insert or update many sources in a single transaction.
+
+    Args:
+        rows: Iterable of ``(name, url, enabled)`` tuples.
+    """
+    conn = get_connection()
+    with conn:
+        conn.executemany(
+            "INSERT INTO sources (name, url, enabled) VALUES (?, ?, ?) "
+            "ON CONFLICT(url) DO UPDATE SET name=excluded.name, enabled=excluded.enabled",
+            [(name, url, int(enabled)) for name, url, enabled in rows],
+        )
+    _bump_sources_version()
+
+
 def get_source_id(url):
     """Look up a source's ID by its URL.
 
@@ -203,6 +710,41 @@ def get_source_last_fetched(source_id):
     return row["last_fetched"] if row and row["last_fetched"] else None
 
 
+def get_source_cache_headers(source_id):
+    """Get the HTTP validators from a source feed's last 200 response.
+
+    Args:
+        source_id: The source's integer ID.
+
+    Returns:
+        An ``(etag, last_modified)`` tuple; either element may be None.
+    """
+    conn = get_connection()
+    row = conn.execute(
+        "SELECT etag, last_modified FROM sources WHERE id = ?", (source_id,)
+    ).fetchone()
+    return (row["etag"], row["last_modified"]) if row else (None, None)
+
+
+def update_source_cache_headers(source_id, etag, last_modified):
+    """Store the HTTP validators from a source feed's last 200 response.
+
+    The feed fetcher sends them back as ``If-None-Match`` /
+    ``If-Modified-Since`` so an unchanged feed answers 304.
+
+    Args:
+        source_id: The source's integer ID.
+        etag: The response's ``ETag`` header, or None.
+        last_modified: The response's ``Last-Modified`` header, or None.
+    """
+    conn = get_connection()
+    conn.execute(
+        "UPDATE sources SET etag = ?, last_modified = ? WHERE id = ?",
+        (etag, last_modified, source_id),
+    )
+    _commit(conn, _bump_sources_version)
+
+
 def article_exists(url):
     """Check whether an article with the given URL already exists.
 
@@ -217,10 +759,34 @@ def article_exists(url):
     return row is not None
 
 
+def existing_article_urls(urls):
+    """Return the subset of ``urls`` that already belong to an article.
+
+    Bulk form of ``article_exists`` for the fetchers: the URLs are bound
+    as one JSON array, so a whole feed is checked in a single statement.
+
+    Args:
+        urls: Iterable of article URLs.
+
+    Returns:
+        A set of the URLs that are already stored.
+    """
+    urls = list(urls)
+    if not urls:
+        return set()
+    conn = get_connection()
+    rows = conn.execute(
+        "SELECT url FROM articles WHERE url IN (SELECT value FROM json_each(?))",
+        (_json.dumps(urls),),
+    )
+    return {r[0] for r in rows}
+
+
 def insert_article(source_id, title, url, author=None, published_date=None, image_url=None):
     """Insert a new article into the database.
 
-    Skips insertion if an article with the same URL already exists.
+    Skips insertion if an article with the same URL already exists; the
+    URL check and the insert are one statement.
 
     Args:
         source_id: Foreign key to the source that produced this article.
@@ -234,19 +800,40 @@ def insert_article(source_id, title, url, author=None, published_date=None, imag
         The new article's integer ID, or None if it already exists or
         insertion fails due to an integrity error.
     """
-    if article_exists(url):
-        return None
     conn = get_connection()
     try:
         cur = conn.execute(
             "INSERT INTO articles (source_id, title, url, author, published_date, image_url) "
-            "VALUES (?, ?, ?, ?, ?, ?)",
+            "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(url) DO NOTHING",
             (source_id, title, url, author, published_date, image_url),
         )
-        conn.commit()
-        return cur.lastrowid
     except sqlite3.IntegrityError:
         return None
+    _commit(conn)
+    return cur.lastrowid if cur.rowcount == 1 else None
+
+
+def insert_articles(rows):
+    """Insert many articles with one prepared statement.
+
+    Bulk form of ``insert_article`` for the fetchers; rows whose URL is
+    already stored are skipped.
+
+    Args:
+        rows: Iterable of ``(source_id, title, url, author, published_date,
+            image_url)`` tuples.
+
+    Returns:
+        Number of articles actually inserted.
+    """
+    conn = get_connection()
+    cur = conn.executemany(
+        "INSERT INTO articles (source_id, title, url, author, published_date, image_url) "
+        "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(url) DO NOTHING",
+        rows,
+    )
+    _commit(conn)
+    return max(cur.rowcount, 0)
 
 
 def update_article_content(article_id, content_raw):
@@ -257,8 +844,31 @@ def update_article_content(article_id, content_raw):
         content_raw: The scraped article text (may be empty string).
     """
     conn = get_connection()
-    conn.execute("UPDATE articles SET content_raw = ? WHERE id = ?", (content_raw, article_id))
-    conn.commit()
+    conn.execute(
+        "INSERT INTO article_contents (article_id, content_raw) VALUES (?, ?) "
+        "ON CONFLICT(article_id) DO UPDATE SET content_raw = excluded.content_raw",
+        (article_id, content_raw),
+    )
+    _commit(conn)
+
+
+def update_article_cache_headers(article_id, etag, last_modified):
+    """Store the HTTP validators from the article page's last 200 response.
+
+    The scraper sends them back as ``If-None-Match`` / ``If-Modified-Since``
+    when the article is scraped again.
+
+    Args:
+        article_id: The article's integer ID.
+        etag: The response's ``ETag`` header, or None.
+        last_modified: The response's ``Last-Modified`` header, or None.
+    """
+    conn = get_connection()
+    conn.execute(
+        "UPDATE articles SET etag = ?, last_modified = ? WHERE id = ?",
+        (etag, last_modified, article_id),
+    )
+    _commit(conn)
 
 
 def update_source_fetched(source_id):
@@ -271,11 +881,57 @@ def update_source_fetched(source_id):
     conn.execute(
         "UPDATE sources SET last_fetched = CURRENT_TIMESTAMP WHERE id = ?", (source_id,)
     )
-    conn.commit()
+    _commit(conn, _bump_sources_version)
 
 
-def get_articles(source_id=None, search=None, tag=None, page=1, limit=20):
-    """Retrieve a paginated list of articles with optional filtering.
+# Source ids whose last_fetched update is waiting for flush_source_fetched()
+_pending_fetched = set()
+_pending_fetched_lock = threading.Lock()
+
+
+def mark_source_fetched(source_id):
+    """Queue a ``last_fetched`` update for the next ``flush_source_fetched``.
+
+    For fetches that wrote nothing else: the timestamp is advisory, so
+    losing it on a crash only widens the next lookback window, and
+    coalescing avoids a commit per unchanged source per poll.
+
+    Args:
+        source_id: The source's integer ID.
+    """
+    with _pending_fetched_lock:
+        _pending_fetched.add(source_id)
+
+
+def flush_source_fetched():
+    """Write all queued ``last_fetched`` updates in one statement.
+
+    Returns:
+        Number of sources updated.
+    """
+    with _pending_fetched_lock:
+        ids = list(_pending_fetched)
+        _pending_fetched.clear()
+    if not ids:
+        return 0
+    conn = get_connection()
+    conn.execute(
+        "UPDATE sources SET last_fetched = CURRENT_TIMESTAMP "
+        "WHERE id IN (SELECT value FROM json_each(?))",
+        (_json.dumps(ids),),
+    )
+    _commit(conn, _bump_sources_version)
+    return len(ids)
+
+
+atexit.register(flush_source_fetched)
+
+
+def iter_articles(source_id=None, search=None, tag=None, page=1, limit=20):
+    """Yield a paginated list of articles with optional filtering.
+
+    Rows are read from the cursor one at a time, so callers that serialize
+    as they go (e.g. a streamed HTTP response) never hold the full page.
 
     Joins articles with their source and summary data. Supports
     filtering by source, full-text search across title/summary/tags,
@@ -284,14 +940,14 @@ def get_articles(source_id=None, search=None, tag=None, page=1, limit=20):
     Args:
         source_id: Filter by this source ID.
         search: Substring to search in title, summary, or tags.
-        tag: Exact tag string to filter by (JSON substring match).
+        tag: Exact tag string to filter by (case-insensitive).
         page: Page number (1-indexed).
         limit: Maximum articles per page.
 
-    Returns:
-        List of article dicts with source and summary fields.
+    Yields:
+        Article dicts with source and summary fields.
     """
-    conn = get_connection()
+    conn = get_reader()
     query = """
         SELECT a.id, a.title, a.url, a.author, a.published_date, a.fetched_date,
                a.image_url, s.name as source_name,
@@ -307,21 +963,36 @@ def get_articles(source_id=None, search=None, tag=None, page=1, limit=20):
         query += " AND a.source_id = ?"
         params.append(source_id)
 
-    if search:
+    if search and _fts_enabled and len(search) >= 3:
+        # Quoted phrase over trigrams == case-insensitive substring match
+        query += " AND a.id IN (SELECT rowid FROM articles_fts WHERE articles_fts MATCH ?)"
+        params.append('"' + search.replace('"', '""') + '"')
+    elif search:
         query += " AND (a.title LIKE ? OR sm.summary_text LIKE ? OR sm.tags LIKE ?)"
         like = f"%{search}%"
         params.extend([like, like, like])
 
     if tag:
-        query += " AND sm.tags LIKE ?"
-        params.append(f'%"{tag}"%')
+        query += " AND a.id IN (SELECT article_id FROM article_tags WHERE tag = ?)"
+        params.append(tag)
 
-    query += " ORDER BY a.published_date DESC NULLS LAST, a.fetched_date DESC"
+    query += " ORDER BY a.published_date IS NULL, a.published_date DESC, a.fetched_date DESC"
     query += " LIMIT ? OFFSET ?"
     params.extend([limit, (page - 1) * limit])
 
-    rows = conn.execute(query, params).fetchall()
-    return [dict(r) for r in rows]
+    for row in conn.execute(query, params):
+        yield dict(row)
+
+
+def get_articles(source_id=None, search=None, tag=None, page=1, limit=20):
+    """Retrieve a paginated list of articles with optional filtering.
+
+    List form of ``iter_articles``; see it for the arguments.
+
+    Returns:
+        List of article dicts with source and summary fields.
+    """
+    return list(iter_articles(source_id=source_id, search=search, tag=tag, page=page, limit=limit))
 
 
 def get_article(article_id):
@@ -332,14 +1003,17 @@ def get_article(article_id):
 
     Returns:
         An article dict with source name and summary fields, or None
-        if the article does not exist.
+        if the article does not exist. ``tags`` and ``key_points`` are
+        always valid JSON text (``'[]'`` when missing or malformed).
     """
-    conn = get_connection()
+    conn = get_reader()
     row = conn.execute(
         """
         SELECT a.*, s.name as source_name,
-               sm.summary_text, sm.key_points, sm.tags, sm.novelty_notes,
-               sm.network_traffic_reason, sm.model_used
+               sm.summary_text,
+               CASE WHEN json_valid(sm.key_points) THEN sm.key_points ELSE '[]' END as key_points,
+               CASE WHEN json_valid(sm.tags) THEN sm.tags ELSE '[]' END as tags,
+               sm.novelty_notes, sm.network_traffic_reason, sm.model_used
         FROM articles a
         JOIN sources s ON a.source_id = s.id
         LEFT JOIN summaries sm ON sm.article_id = a.id
@@ -380,7 +1054,7 @@ def save_summary(article_id, summary_text, key_points, tags, novelty_notes, mode
         (article_id, summary_text, key_points, tags, novelty_notes,
          network_traffic_reason, model_used),
     )
-    conn.commit()
+    _commit(conn, _bump_summaries_version)
 
 
 def get_unsummarized_articles(limit=10, article_ids=None):
@@ -391,17 +1065,19 @@ def get_unsummarized_articles(limit=10, article_ids=None):
         article_ids: Optional list of article IDs to restrict results to.
 
     Returns:
-        List of dicts with ``id``, ``title``, ``url``, and ``content_raw``.
+        List of ``sqlite3.Row`` with ``id``, ``title``, ``url``, and
+        ``content_raw``.
     """
     conn = get_connection()
     if article_ids:
         placeholders = ",".join("?" * len(article_ids))
         rows = conn.execute(
             f"""
-            SELECT a.id, a.title, a.url, a.content_raw
+            SELECT a.id, a.title, a.url, ac.content_raw
             FROM articles a
+            JOIN article_contents ac ON ac.article_id = a.id
             LEFT JOIN summaries sm ON sm.article_id = a.id
-            WHERE sm.id IS NULL AND a.content_raw IS NOT NULL AND a.content_raw != ''
+            WHERE sm.id IS NULL AND ac.content_raw != ''
               AND a.duplicate_of_id IS NULL
               AND a.id IN ({placeholders})
             ORDER BY a.fetched_date DESC
@@ -412,37 +1088,43 @@ def get_unsummarized_articles(limit=10, article_ids=None):
     else:
         rows = conn.execute(
             """
-            SELECT a.id, a.title, a.url, a.content_raw
+            SELECT a.id, a.title, a.url, ac.content_raw
             FROM articles a
+            JOIN article_contents ac ON ac.article_id = a.id
             LEFT JOIN summaries sm ON sm.article_id = a.id
-            WHERE sm.id IS NULL AND a.content_raw IS NOT NULL AND a.content_raw != ''
+            WHERE sm.id IS NULL AND ac.content_raw != ''
               AND a.duplicate_of_id IS NULL
             ORDER BY a.fetched_date DESC
             LIMIT ?
             """,
             (limit,),
         ).fetchall()
-    return [dict(r) for r in rows]
+    return rows
 
 
 def get_unscraped_articles(limit=20, article_ids=None):
     """Fetch articles that have not been scraped yet.
 
+    Articles pointing to downloadable files are excluded; see
+    ``delete_file_url_articles``.
+
     Args:
         limit: Maximum number of articles to return.
         article_ids: Optional list of article IDs to restrict results to.
 
     Returns:
-        List of dicts with ``id`` and ``url``.
+        List of ``sqlite3.Row`` with ``id``, ``url``, ``etag`` and
+        ``last_modified``.
     """
     conn = get_connection()
     if article_ids:
         placeholders = ",".join("?" * len(article_ids))
         rows = conn.execute(
             f"""
-            SELECT id, url FROM articles
-            WHERE content_raw IS NULL
+            SELECT id, url, etag, last_modified FROM articles
+            WHERE NOT EXISTS (SELECT 1 FROM article_contents ac WHERE ac.article_id = articles.id)
               AND id IN ({placeholders})
+              AND NOT is_file_url(url)
             ORDER BY fetched_date DESC
             LIMIT ?
             """,
@@ -451,14 +1133,15 @@ def get_unscraped_articles(limit=20, article_ids=None):
     else:
         rows = conn.execute(
             """
-            SELECT id, url FROM articles
-            WHERE content_raw IS NULL
+            SELECT id, url, etag, last_modified FROM articles
+            WHERE NOT EXISTS (SELECT 1 FROM article_contents ac WHERE ac.article_id = articles.id)
+              AND NOT is_file_url(url)
             ORDER BY fetched_date DESC
             LIMIT ?
             """,
             (limit,),
         ).fetchall()
-    return [dict(r) for r in rows]
+    return rows
 
 
 def get_sources():
@@ -467,30 +1150,45 @@ def get_sources():
     Returns:
         List of source dicts with all columns.
     """
-    conn = get_connection()
+    conn = get_reader()
     rows = conn.execute("SELECT * FROM sources ORDER BY name").fetchall()
     return [dict(r) for r in rows]
 
 
+# One pass over article_contents answers every content-status count: each
+# scraped row is classified by its content and its summary, if any.
+_CONTENT_STATUS_SQL = """
+    SELECT
+        COALESCE(SUM(ac.content_raw != '' AND sm.id IS NULL
+                     AND a.duplicate_of_id IS NULL), 0) AS unsummarized,
+        COALESCE(SUM(ac.content_raw = ''), 0) AS scrape_failed,
+        COALESCE(SUM(ac.content_raw != '' AND sm.id IS NOT NULL
+                     AND (sm.model_used = 'failed' OR sm.summary_text IS NULL
+                          OR sm.summary_text = '')), 0) AS failed_summaries
+    FROM article_contents ac
+    JOIN articles a ON a.id = ac.article_id
+    LEFT JOIN summaries sm ON sm.article_id = ac.article_id
+"""
+
+
+def _content_status_counts(conn=None):
+    """Return ``(unsummarized, scrape_failed, failed_summaries)`` counts.
+
+    Args:
+        conn: Connection to query on; defaults to this thread's connection.
+    """
+    row = (conn or get_connection()).execute(_CONTENT_STATUS_SQL).fetchone()
+    return row["unsummarized"], row["scrape_failed"], row["failed_summaries"]
+
+
 def get_unsummarized_count():
     """Count articles with scraped content but no summary."""
-    conn = get_connection()
-    return conn.execute(
-        """
-        SELECT COUNT(*) as c FROM articles a
-        LEFT JOIN summaries sm ON sm.article_id = a.id
-        WHERE sm.id IS NULL AND a.content_raw IS NOT NULL AND a.content_raw != ''
-          AND a.duplicate_of_id IS NULL
-        """
-    ).fetchone()["c"]
+    return _content_status_counts()[0]
 
 
 def get_scrape_failed_count():
     """Count articles where scraping was attempted but returned empty content."""
-    conn = get_connection()
-    return conn.execute(
-        "SELECT COUNT(*) as c FROM articles WHERE content_raw = ''"
-    ).fetchone()["c"]
+    return _content_status_counts()[1]
 
 
 def get_failure_articles(failure_type, page, limit):
@@ -504,7 +1202,7 @@ def get_failure_articles(failure_type, page, limit):
     Returns:
         Dict with keys ``articles`` (list of dicts) and ``total`` (int).
     """
-    conn = get_connection()
+    conn = get_reader()
     offset = (page - 1) * limit
 
     source_join = "LEFT JOIN sources s ON s.id = a.source_id "
@@ -512,9 +1210,10 @@ def get_failure_articles(failure_type, page, limit):
     if failure_type == "unsummarized":
         base_where = (
             "FROM articles a "
+            "JOIN article_contents ac ON ac.article_id = a.id "
             "LEFT JOIN summaries sm ON sm.article_id = a.id "
             f"{source_join}"
-            "WHERE sm.id IS NULL AND a.content_raw IS NOT NULL AND a.content_raw != ''"
+            "WHERE sm.id IS NULL AND ac.content_raw != ''"
         )
         total = conn.execute(f"SELECT COUNT(*) as c {base_where}").fetchone()["c"]
         rows = conn.execute(
@@ -524,21 +1223,23 @@ def get_failure_articles(failure_type, page, limit):
         ).fetchall()
     elif failure_type == "scrape_failed":
         total = conn.execute(
-            "SELECT COUNT(*) as c FROM articles WHERE content_raw = ''"
+            "SELECT COUNT(*) as c FROM article_contents WHERE content_raw = ''"
         ).fetchone()["c"]
         rows = conn.execute(
             f"SELECT a.id, a.title, a.url, a.fetched_date, s.name as source_name "
-            f"FROM articles a {source_join}"
-            "WHERE a.content_raw = '' ORDER BY a.fetched_date DESC LIMIT ? OFFSET ?",
+            "FROM article_contents ac JOIN articles a ON a.id = ac.article_id "
+            f"{source_join}"
+            "WHERE ac.content_raw = '' ORDER BY a.fetched_date DESC LIMIT ? OFFSET ?",
             (limit, offset),
         ).fetchall()
     else:  # failed_summaries
         base_where = (
             "FROM articles a "
+            "JOIN article_contents ac ON ac.article_id = a.id "
             "JOIN summaries sm ON sm.article_id = a.id "
             f"{source_join}"
             "WHERE (sm.model_used = 'failed' OR sm.summary_text IS NULL OR sm.summary_text = '') "
-            "AND a.content_raw IS NOT NULL AND a.content_raw != ''"
+            "AND ac.content_raw != ''"
         )
         total = conn.execute(f"SELECT COUNT(*) as c {base_where}").fetchone()["c"]
         rows = conn.execute(
@@ -554,7 +1255,11 @@ def get_failure_articles(failure_type, page, limit):
 
 
 def reset_scrape_failed_articles(article_ids):
-    """Reset content_raw to NULL for scrape-failed articles so they can be re-scraped.
+    """Drop the empty content of scrape-failed articles so they can be re-scraped.
+
+    The articles' stored ``etag`` / ``last_modified`` validators are cleared
+    too: a retry must download and extract the page again, and a 304 for
+    an article with no stored content would only mark it failed again.
 
     Args:
         article_ids: List of integer article IDs.
@@ -564,7 +1269,13 @@ def reset_scrape_failed_articles(article_ids):
     conn = get_connection()
     placeholders = ",".join("?" * len(article_ids))
     conn.execute(
-        f"UPDATE articles SET content_raw = NULL WHERE id IN ({placeholders})",
+        f"""UPDATE articles SET etag = NULL, last_modified = NULL
+            WHERE id IN ({placeholders})
+              AND id IN (SELECT article_id FROM article_contents WHERE content_raw = '')""",
+        article_ids,
+    )
+    conn.execute(
+        f"DELETE FROM article_contents WHERE content_raw = '' AND article_id IN ({placeholders})",
         article_ids,
     )
     conn.commit()
@@ -586,43 +1297,37 @@ def delete_failed_summaries(article_ids):
         article_ids,
     )
     conn.commit()
+    _bump_summaries_version()
 
 
 def get_stats():
     """Compute aggregate statistics for the dashboard.
 
+    All counts come from one statement: the table totals are scalar
+    subqueries answered from their own indexes, and the three
+    content-status counts share one pass (``_CONTENT_STATUS_SQL``).
+
     Returns:
         A dict with keys ``total_articles``, ``total_sources``,
         ``total_summaries``, ``articles_last_24h``, ``unsummarized``,
-        and ``scrape_failed``.
+        ``scrape_failed``, and ``failed_summaries``.
     """
-    conn = get_connection()
-    total_articles = conn.execute("SELECT COUNT(*) as c FROM articles").fetchone()["c"]
-    total_sources = conn.execute("SELECT COUNT(*) as c FROM sources WHERE enabled=1").fetchone()["c"]
-    total_summaries = conn.execute(
-        "SELECT COUNT(*) as c FROM summaries "
-        "WHERE model_used != 'failed' AND summary_text IS NOT NULL AND summary_text != ''"
-    ).fetchone()["c"]
-    recent = conn.execute(
-        "SELECT COUNT(*) as c FROM articles WHERE fetched_date >= datetime('now', '-24 hours')"
-    ).fetchone()["c"]
-    unsummarized = get_unsummarized_count()
-    scrape_failed = get_scrape_failed_count()
-    failed_summaries = conn.execute(
-        "SELECT COUNT(*) as c FROM summaries sm "
-        "JOIN articles a ON a.id = sm.article_id "
-        "WHERE (sm.model_used = 'failed' OR sm.summary_text IS NULL OR sm.summary_text = '') "
-        "AND a.content_raw IS NOT NULL AND a.content_raw != ''"
-    ).fetchone()["c"]
-    return {
-        "total_articles": total_articles,
-        "total_sources": total_sources,
-        "total_summaries": total_summaries,
-        "articles_last_24h": recent,
-        "unsummarized": unsummarized,
-        "scrape_failed": scrape_failed,
-        "failed_summaries": failed_summaries,
-    }
+    conn = get_reader()
+    row = conn.execute(
+        """
+        SELECT
+            (SELECT COUNT(*) FROM articles) AS total_articles,
+            (SELECT COUNT(*) FROM sources WHERE enabled = 1) AS total_sources,
+            (SELECT COUNT(*) FROM summaries
+             WHERE model_used != 'failed' AND summary_text IS NOT NULL
+               AND summary_text != '') AS total_summaries,
+            (SELECT COUNT(*) FROM articles
+             WHERE fetched_date >= datetime('now', '-24 hours')) AS articles_last_24h,
+            cs.unsummarized, cs.scrape_failed, cs.failed_summaries
+        FROM (%s) cs
+        """ % _CONTENT_STATUS_SQL
+    ).fetchone()
+    return dict(row)
 
 
 def save_embedding(article_id, embedding_bytes, model_used):
@@ -630,19 +1335,32 @@ def save_embedding(article_id, embedding_bytes, model_used):
 
     Args:
         article_id: The article's integer ID.
-        embedding_bytes: Raw bytes of the float32 numpy embedding vector.
+        embedding_bytes: Embedding BLOB from ``encode_embedding``.
         model_used: The embedding model name (e.g. ``"text-embedding-3-small"``).
     """
+    save_embeddings([(article_id, embedding_bytes, model_used)])
+
+
+def save_embeddings(rows):
+    """Upsert many embedding BLOBs with one prepared statement and one commit.
+
+    Args:
+        rows: List of ``(article_id, embedding_bytes, model_used)`` tuples,
+            as for ``save_embedding``.
+    """
     conn = get_connection()
-    conn.execute(
+    conn.executemany(
         "INSERT INTO article_embeddings (article_id, embedding, model_used) "
         "VALUES (?, ?, ?) "
         "ON CONFLICT(article_id) DO UPDATE SET "
         "embedding=excluded.embedding, model_used=excluded.model_used, "
         "created_date=CURRENT_TIMESTAMP",
-        (article_id, embedding_bytes, model_used),
+        rows,
     )
-    conn.commit()
+    if _vec_enabled:
+        for article_id, embedding_bytes, _ in rows:
+            _index_vector(conn, article_id, embedding_bytes)
+    _commit(conn)
 
 
 def save_dedup_embedding(article_id, embedding_bytes, model_used):
@@ -655,7 +1373,7 @@ def save_dedup_embedding(article_id, embedding_bytes, model_used):
 
     Args:
         article_id: The article's integer ID.
-        embedding_bytes: Raw bytes of the float32 numpy embedding vector.
+        embedding_bytes: Embedding BLOB from ``encode_embedding``.
         model_used: The embedding model name (e.g. ``"text-embedding-3-small"``).
     """
     conn = get_connection()
@@ -667,7 +1385,7 @@ def save_dedup_embedding(article_id, embedding_bytes, model_used):
         "created_date=CURRENT_TIMESTAMP",
         (article_id, embedding_bytes, model_used),
     )
-    conn.commit()
+    _commit(conn)
 
 
 def get_dedup_candidates(limit=None):
@@ -684,10 +1402,11 @@ def get_dedup_candidates(limit=None):
     """
     conn = get_connection()
     query = """
-        SELECT a.id, a.title, a.content_raw, a.published_date, a.fetched_date
+        SELECT a.id, a.title, ac.content_raw, a.published_date, a.fetched_date
         FROM articles a
+        JOIN article_contents ac ON ac.article_id = a.id
         LEFT JOIN summaries sm ON sm.article_id = a.id
-        WHERE sm.id IS NULL AND a.content_raw IS NOT NULL AND a.content_raw != ''
+        WHERE sm.id IS NULL AND ac.content_raw != ''
           AND a.duplicate_of_id IS NULL
         ORDER BY a.fetched_date DESC
     """
@@ -779,7 +1498,7 @@ def get_duplicate_articles(article_id):
         List of article dicts (as from ``get_articles_by_ids``) for the
         duplicates, or an empty list if there are none.
     """
-    conn = get_connection()
+    conn = get_reader()
     rows = conn.execute(
         "SELECT article_id_2 FROM article_correlations "
         "WHERE correlation_type = 'duplicate' AND article_id_1 = ?",
@@ -791,6 +1510,52 @@ def get_duplicate_articles(article_id):
     return get_articles_by_ids(dup_ids)
 
 
+# Embedding BLOBs are stored as int8 with one float32 scale per vector:
+# ``_Q8U_MAGIC + scale + int8[D]``, a quarter of the raw float32 size. The
+# scale is ``1 / |int8 vector|``, so vectors decode L2-normalised and cosine
+# similarity is a plain dot product. ``_Q8_MAGIC`` marks the earlier
+# peak-scaled encoding; BLOBs without either tag are legacy float32 vectors.
+# Both older forms still decode and are rewritten by ``_normalize_embeddings``.
+_Q8U_MAGIC = b"\x00Q8U"
+_Q8_MAGIC = b"\x00Q8\x00"
+
+
+def encode_embedding(vector):
+    """Quantize an embedding vector to the stored unit-norm int8 BLOB format.
+
+    Args:
+        vector: Sequence or array of floats.
+
+    Returns:
+        Bytes: ``_Q8U_MAGIC``, the float32 scale, then one int8 per dimension.
+    """
+    import numpy as np
+
+    v = np.asarray(vector, dtype=np.float32)
+    peak = float(np.max(np.abs(v))) if v.size else 0.0
+    q = np.clip(np.rint(v * (127.0 / peak)), -127, 127) if peak > 0 else np.zeros_like(v)
+    norm = float(np.linalg.norm(q))
+    scale = np.float32(1.0 / norm if norm > 0 else 1.0)
+    return _Q8U_MAGIC + scale.tobytes() + q.astype(np.int8).tobytes()
+
+
+def decode_embedding(blob):
+    """Decode a stored embedding BLOB to a float32 vector.
+
+    Args:
+        blob: Bytes from ``article_embeddings`` or ``article_dedup_embeddings``.
+
+    Returns:
+        A numpy float32 ndarray.
+    """
+    import numpy as np
+
+    if blob[:4] in (_Q8U_MAGIC, _Q8_MAGIC):
+        scale = np.frombuffer(blob, dtype=np.float32, count=1, offset=4)[0]
+        return np.frombuffer(blob, dtype=np.int8, offset=8).astype(np.float32) * scale
+    return np.frombuffer(blob, dtype=np.float32)
+
+
 def get_all_embeddings(model_used=None):
     """Fetch all stored embeddings from the database.
 
@@ -799,7 +1564,7 @@ def get_all_embeddings(model_used=None):
             this model only.
 
     Returns:
-        List of dicts with ``article_id`` and ``embedding`` (BLOB).
+        List of ``sqlite3.Row`` with ``article_id`` and ``embedding`` (BLOB).
     """
     conn = get_connection()
     if model_used:
@@ -811,7 +1576,116 @@ def get_all_embeddings(model_used=None):
         rows = conn.execute(
             "SELECT article_id, embedding FROM article_embeddings"
         ).fetchall()
-    return [dict(r) for r in rows]
+    return rows
+
+
+# Rows per block yielded by ``iter_embedding_tiles``: 256 x 1536 float32 is
+# 1.5 MB, small enough to stay cache-resident while it is scored
+EMBEDDING_TILE_ROWS = 256
+
+
+def _embeddings_query(model_used, since_days):
+    """Build the ``(sql, params)`` selecting ``(article_id, embedding)`` rows."""
+    sql = "SELECT ae.article_id, ae.embedding FROM article_embeddings ae"
+    where, params = [], []
+    if since_days is not None:
+        sql += " JOIN articles a ON a.id = ae.article_id"
+        where.append("date(COALESCE(a.published_date, a.fetched_date)) >= date('now', ?)")
+        params.append(f"-{int(since_days)} days")
+    if model_used:
+        where.append("ae.model_used = ?")
+        params.append(model_used)
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    return sql, params
+
+
+def _decode_embedding_rows(rows):
+    """Decode non-empty ``(article_id, embedding)`` rows to ``(ids, matrix)``.
+
+    Rows in the int8 format are dequantized in one vectorized pass over
+    the concatenated BLOBs; mixed-format rows are decoded one at a time
+    (see ``decode_embedding``) into a preallocated float32 array.
+    """
+    import numpy as np
+
+    ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+    blobs = [r[1] for r in rows]
+    size = len(blobs[0])
+    if all(b[:4] == _Q8U_MAGIC and len(b) == size for b in blobs):
+        # Uniform int8 rows: one int8 view over the concatenated BLOBs, then a
+        # single widen-and-scale instead of a decode per row
+        raw = np.frombuffer(b"".join(blobs), dtype=np.uint8).reshape(len(blobs), size)
+        scales = raw[:, 4:8].copy().view(np.float32)
+        matrix = raw[:, 8:].view(np.int8).astype(np.float32)
+        matrix *= scales
+        return ids, matrix
+
+    matrix = np.empty((len(rows), decode_embedding(blobs[0]).shape[0]), dtype=np.float32)
+    for i, blob in enumerate(blobs):
+        matrix[i] = decode_embedding(blob)
+    return ids, matrix
+
+
+def iter_embedding_tiles(model_used=None, since_days=None, tile_rows=EMBEDDING_TILE_ROWS):
+    """Stream stored embeddings as fixed-size blocks for vectorized search.
+
+    The cursor is drained ``tile_rows`` rows at a time, so a caller that
+    scores and discards each block never holds more than one tile of
+    decoded vectors.
+
+    Args:
+        model_used: If provided, only embeddings from this model.
+        since_days: If provided, only articles published (or, lacking a
+            date, fetched) within this many days.
+        tile_rows: Maximum rows per yielded block.
+
+    Yields:
+        ``(ids, matrix)`` tuples: an int64 array of article IDs and the
+        float32 embedding rows aligned with it, at most ``tile_rows`` each.
+    """
+    sql, params = _embeddings_query(model_used, since_days)
+    cursor = get_reader().execute(sql, params)
+    try:
+        while True:
+            rows = cursor.fetchmany(tile_rows)
+            if not rows:
+                return
+            yield _decode_embedding_rows(rows)
+    finally:
+        cursor.close()
+
+
+def nearest_articles(query_vector, k, since_days=None):
+    """Return the ``k`` articles whose embeddings are closest to a query.
+
+    Runs the cosine KNN inside SQLite on the sqlite-vec ``article_vec``
+    index, so no stored vectors are shipped to Python. The time filter is
+    a metadata constraint applied during the KNN walk.
+
+    Args:
+        query_vector: Float sequence or array of ``VECTOR_DIMS`` values.
+        k: Number of neighbours to return.
+        since_days: If provided, only articles published (or, lacking a
+            date, fetched) within this many days.
+
+    Returns:
+        List of ``(article_id, similarity)`` tuples, most similar first, or
+        None if the vector index is unavailable (callers fall back to
+        ``iter_embedding_tiles``).
+    """
+    if not _vec_enabled:
+        return None
+    import numpy as np
+
+    query = np.asarray(query_vector, dtype=np.float32)
+    sql = "SELECT article_id, distance FROM article_vec WHERE embedding MATCH ? AND k = ?"
+    params = [query.tobytes(), int(k)]
+    if since_days is not None:
+        sql += " AND published_day >= date('now', ?)"
+        params.append(f"-{int(since_days)} days")
+    rows = get_reader().execute(sql + " ORDER BY distance", params).fetchall()
+    return [(r[0], 1.0 - r[1]) for r in rows]
 
 
 def get_unembedded_articles(limit=50, article_ids=None):
@@ -873,7 +1747,7 @@ def get_embedding_stats():
     Returns:
         A dict with ``total_summarized`` and ``total_embedded`` counts.
     """
-    conn = get_connection()
+    conn = get_reader()
     total_summarized = conn.execute(
         "SELECT COUNT(*) as c FROM summaries "
         "WHERE model_used != 'failed' "
@@ -906,7 +1780,7 @@ def get_article_ids_since_days(since_days, model_used=None):
     Returns:
         A set of integer article IDs.
     """
-    conn = get_connection()
+    conn = get_reader()
     cutoff = f"-{int(since_days)} days"
     if model_used:
         rows = conn.execute(
@@ -944,23 +1818,25 @@ def get_articles_by_ids(article_ids):
     """
     if not article_ids:
         return []
-    conn = get_connection()
-    ph = ",".join("?" * len(article_ids))
+    conn = get_reader()
+    # The ids travel as one JSON parameter, so the SQL text (and its cached
+    # prepared statement) is the same for every call, and SQLite returns
+    # the rows already in input order.
     rows = conn.execute(
-        f"""
+        """
+        WITH ranked(id, pos) AS (SELECT value, key FROM json_each(?))
         SELECT a.id, a.title, a.url, a.author, a.published_date, a.fetched_date,
                a.image_url, s.name as source_name,
                sm.summary_text, sm.key_points, sm.tags, sm.novelty_notes
-        FROM articles a
+        FROM ranked r
+        JOIN articles a ON a.id = r.id
         JOIN sources s ON a.source_id = s.id
         LEFT JOIN summaries sm ON sm.article_id = a.id
-        WHERE a.id IN ({ph})
+        ORDER BY r.pos
         """,
-        list(article_ids),
+        (_json.dumps([int(aid) for aid in article_ids]),),
     ).fetchall()
-    # Preserve the ranked order from article_ids
-    by_id = {r["id"]: dict(r) for r in rows}
-    return [by_id[aid] for aid in article_ids if aid in by_id]
+    return [dict(r) for r in rows]
 
 
 # Mapping from specific tags to broad categories.
@@ -1070,6 +1946,28 @@ _KNOWN_ENTITIES = {
 }
 
 
+def _compile_category_matchers():
+    """Precompute per-category keyword matchers for ``_tag_to_category``.
+
+    Returns:
+        A list of ``(category_name, short_set, short_keywords, long_re,
+        long_joined)`` tuples in ``_CATEGORY_RULES`` order. ``long_joined``
+        holds the long keywords separated by NUL so that one ``in`` test
+        answers "is the tag a substring of any keyword".
+    """
+    matchers = []
+    for category_name, keywords in _CATEGORY_RULES:
+        short = tuple(kw for kw in keywords if len(kw) <= 3)
+        long_ = [kw for kw in keywords if len(kw) > 3]
+        long_re = re.compile("|".join(re.escape(kw) for kw in long_)) if long_ else None
+        matchers.append((category_name, frozenset(short), short, long_re, "\0".join(long_)))
+    return matchers
+
+
+_CATEGORY_MATCHERS = _compile_category_matchers()
+
+
+@lru_cache(maxsize=8192)
 def _tag_to_category(tag):
     """Map a single tag to a broad category name.
 
@@ -1077,7 +1975,7 @@ def _tag_to_category(tag):
     hyphen-component match, or prefix+digit match (e.g. ``"apt"``
     matches ``"apt29"``). Longer keywords use substring matching.
     Falls back to MITRE ATT&CK entity lookup for tags not covered
-    by ``_CATEGORY_RULES``.
+    by ``_CATEGORY_RULES``. Results are memoized per tag string.
 
     Args:
         tag: A lowercase tag string.
@@ -1087,17 +1985,16 @@ def _tag_to_category(tag):
     """
     tag_lower = tag.strip().lower()
     parts = tag_lower.split("-")
-    for category_name, keywords in _CATEGORY_RULES:
-        for kw in keywords:
-            if len(kw) <= 3:
-                # Short keywords: exact, component, or prefix+digit
-                if tag_lower == kw or kw in parts:
-                    return category_name
-                if tag_lower.startswith(kw) and tag_lower[len(kw):].isdigit():
-                    return category_name
-            else:
-                if kw in tag_lower or tag_lower in kw:
-                    return category_name
+    for category_name, short_set, short, long_re, long_joined in _CATEGORY_MATCHERS:
+        # Short keywords: exact, component, or prefix+digit
+        if tag_lower in short_set or not short_set.isdisjoint(parts):
+            return category_name
+        for kw in short:
+            if tag_lower.startswith(kw) and tag_lower[len(kw):].isdigit():
+                return category_name
+        # Long keywords: keyword in tag, or tag in keyword
+        if long_re is not None and (long_re.search(tag_lower) or tag_lower in long_joined):
+            return category_name
     # Fallback: check MITRE ATT&CK known entities (merged with extras)
     if tag_lower in _KNOWN_ENTITIES.get("Threat Actors", {}):
         return "Threat Actors"
@@ -1111,6 +2008,42 @@ def _tag_to_category(tag):
 _VERSION_SUFFIX_RE = re.compile(r'[-_.\s]*(v?\d+(\.\d+)?|_v\d+)\s*$', re.IGNORECASE)
 
 
+def _strip_version_suffix(text):
+    """Return *text* without a trailing version suffix, or None if it has none."""
+    m = _VERSION_SUFFIX_RE.search(text)
+    if not m:
+        return None
+    base = text[:m.start()].rstrip("-_. ")
+    return base if base and base != text else None
+
+
+def _build_canonical_map():
+    """Map each ``(category, known_tag)`` to its base family tag.
+
+    Covers aliases whose display name carries a version (e.g.
+    ``'lockbit-black'`` -> display ``'LockBit 3.0'`` -> ``'lockbit'``) as well
+    as versioned keys whose stripped form is itself a known entity. Only
+    entries that actually change are stored.
+    """
+    canonical = {}
+    for category_name, entities in _KNOWN_ENTITIES.items():
+        for tag_lower, display in entities.items():
+            base = _strip_version_suffix(tag_lower)
+            if base in entities:
+                canonical[(category_name, tag_lower)] = base
+                continue
+            base_display = _strip_version_suffix(display)
+            if base_display:
+                base_tag = base_display.strip().lower().replace(" ", "-")
+                if base_tag in entities:
+                    canonical[(category_name, tag_lower)] = base_tag
+    return canonical
+
+
+_CANONICAL_MAP = _build_canonical_map()
+
+
+@lru_cache(maxsize=8192)
 def _canonical_entity_tag(tag_lower, category_name):
     """Consolidate versioned entity variants under their base family name.
 
@@ -1122,7 +2055,9 @@ def _canonical_entity_tag(tag_lower, category_name):
 
     Only strips the version suffix if the resulting base name is itself
     a known entity, preventing over-stripping (e.g. ``'apt29'`` does
-    NOT become ``'apt'``).
+    NOT become ``'apt'``). Known entity tags resolve through the
+    precomputed ``_CANONICAL_MAP``; other tags are stripped once and
+    memoized.
 
     Args:
         tag_lower: Lowercase tag string, possibly with version suffix.
@@ -1132,26 +2067,12 @@ def _canonical_entity_tag(tag_lower, category_name):
         The canonical base tag string.
     """
     entities = _KNOWN_ENTITIES.get(category_name, {})
-
-    # 1. Try stripping version directly from the tag
-    m = _VERSION_SUFFIX_RE.search(tag_lower)
-    if m:
-        base = tag_lower[:m.start()].rstrip("-_. ")
-        if base and base != tag_lower and base in entities:
-            return base
-
-    # 2. Try stripping version from the entity's display name
-    #    Handles aliases like "lockbit-black" → display "LockBit 3.0" → "LockBit"
     if tag_lower in entities:
-        display = entities[tag_lower]
-        m2 = _VERSION_SUFFIX_RE.search(display)
-        if m2:
-            base_display = display[:m2.start()].strip()
-            if base_display and base_display != display:
-                base_tag = base_display.lower().replace(" ", "-")
-                if base_tag in entities:
-                    return base_tag
+        return _CANONICAL_MAP.get((category_name, tag_lower), tag_lower)
 
+    base = _strip_version_suffix(tag_lower)
+    if base in entities:
+        return base
     return tag_lower
 
 
@@ -1227,34 +2148,41 @@ def get_subcategories(category_name, limit_per_sub=50, since_days=None):
         return []
 
     articles = get_articles_for_category(category_name, since_days=since_days)
+    if not articles:
+        return []
 
-    # tag -> {article_id: article_dict}
-    sub_map = {}
-    sub_order = []
-    matched_ids = set()
+    # Distinct tags across the category's articles, grouped by SQLite from
+    # the normalized article_tags table (NOCASE, so case variants merge).
+    position = {a["id"]: i for i, a in enumerate(articles)}
+    rows = get_reader().execute(
+        """
+        SELECT tag, json_group_array(article_id) AS ids
+        FROM article_tags
+        WHERE article_id IN (SELECT value FROM json_each(?))
+        GROUP BY tag
+        """,
+        (_json.dumps(list(position)),),
+    ).fetchall()
 
-    for article in articles:
-        try:
-            tags = _json.loads(article.get("tags") or "[]")
-        except (_json.JSONDecodeError, TypeError):
-            tags = []
-
-        for tag in tags:
-            cat = _tag_to_category(tag)
-            if cat == category_name and not _is_generic_tag(tag, category_name):
-                # Canonicalize to base family name for grouping
-                tag_lower = tag.strip().lower()
-                canonical = _canonical_entity_tag(tag_lower, category_name)
-                if canonical not in sub_map:
-                    sub_map[canonical] = {}
-                    sub_order.append(canonical)
-                if article["id"] not in sub_map[canonical]:
-                    sub_map[canonical][article["id"]] = article
-                    matched_ids.add(article["id"])
+    # canonical tag -> set of article ids
+    sub_map = {}
+    for row in rows:
+        tag = row["tag"]
+        if _tag_to_category(tag) != category_name or _is_generic_tag(tag, category_name):
+            continue
+        # Canonicalize to base family name for grouping
+        canonical = _canonical_entity_tag(tag.strip().lower(), category_name)
+        sub_map.setdefault(canonical, set()).update(_json.loads(row["ids"]))
 
+    matched_ids = set()
     result = []
-    for tag_key in sorted(sub_order, key=lambda t: -len(sub_map[t])):
-        arts = list(sub_map[tag_key].values())
+    ranked = sorted(
+        sub_map.items(),
+        key=lambda kv: (-len(kv[1]), min(position[i] for i in kv[1]), kv[0]),
+    )
+    for tag_key, ids in ranked:
+        matched_ids.update(ids)
+        arts = [articles[position[i]] for i in sorted(ids, key=position.__getitem__)]
         result.append({
             "tag": tag_key,
             "display_name": _format_entity_name(tag_key),
@@ -1279,8 +2207,10 @@ def get_categorized_articles(limit_per_category=10, since_days=None):
     """Return articles grouped into broad threat categories.
 
     Tags are consolidated into a small set of meaningful categories
-    via ``_tag_to_category``. Articles with tags spanning multiple
-    categories appear in each relevant category.
+    via ``_tag_to_category``, precomputed per tag in
+    ``article_tags.category``. Articles with tags spanning multiple
+    categories appear in each relevant category. Only the 500 most recent
+    tagged articles are considered.
 
     Args:
         limit_per_category: Maximum articles to include per category.
@@ -1291,58 +2221,61 @@ def get_categorized_articles(limit_per_category=10, since_days=None):
         List of category dicts sorted by count descending, each with
         keys ``name``, ``count``, and ``articles``.
     """
-    conn = get_connection()
+    conn = get_reader()
     params = []
     date_filter = ""
     if since_days:
         date_filter = f" AND date(a.published_date) >= date('now', ?)"
         params.append(f"-{since_days} days")
+    params.append(limit_per_category)
     rows = conn.execute(
         f"""
-        SELECT a.id, a.title, a.url, a.author, a.published_date, a.fetched_date,
+        WITH recent AS (
+            SELECT a.id, ROW_NUMBER() OVER (
+                ORDER BY a.published_date IS NULL, a.published_date DESC, a.fetched_date DESC
+            ) AS pos
+            FROM articles a
+            JOIN summaries sm ON sm.article_id = a.id
+            WHERE sm.tags IS NOT NULL AND sm.tags != '[]'{date_filter}
+            ORDER BY pos
+            LIMIT 500
+        ),
+        in_category AS (
+            SELECT DISTINCT t.category, r.id, r.pos
+            FROM recent r
+            JOIN article_tags t ON t.article_id = r.id
+            WHERE t.category IS NOT NULL
+        ),
+        ranked AS (
+            SELECT category, id, pos,
+                   ROW_NUMBER() OVER (PARTITION BY category ORDER BY pos) AS rn,
+                   COUNT(*) OVER (PARTITION BY category) AS cnt,
+                   MIN(pos) OVER (PARTITION BY category) AS first_pos
+            FROM in_category
+        )
+        SELECT r.category, r.cnt,
+               a.id, a.title, a.url, a.author, a.published_date, a.fetched_date,
                a.image_url, s.name as source_name,
                sm.summary_text, sm.key_points, sm.tags, sm.novelty_notes
-        FROM articles a
+        FROM ranked r
+        JOIN articles a ON a.id = r.id
         JOIN sources s ON a.source_id = s.id
         LEFT JOIN summaries sm ON sm.article_id = a.id
-        WHERE sm.tags IS NOT NULL AND sm.tags != '[]'{date_filter}
-        ORDER BY a.published_date DESC NULLS LAST, a.fetched_date DESC
-        LIMIT 500
+        WHERE r.rn <= ?
+        ORDER BY r.cnt DESC, r.first_pos, r.category, r.rn
         """,
         params,
     ).fetchall()
 
-    # Build category -> articles map (deduplicate by article id)
-    cat_map = {}      # category_name -> {article_id: article_dict}
-    cat_order = []     # preserve insertion order for stable sorting
-
+    # Rows arrive grouped by category, largest first, newest first within
+    categories = []
     for row in rows:
         article = dict(row)
-        try:
-            tags = _json.loads(article.get("tags") or "[]")
-        except (_json.JSONDecodeError, TypeError):
-            tags = []
-
-        assigned = set()
-        for tag in tags:
-            cat = _tag_to_category(tag)
-            if cat and cat not in assigned:
-                assigned.add(cat)
-                if cat not in cat_map:
-                    cat_map[cat] = {}
-                    cat_order.append(cat)
-                if article["id"] not in cat_map[cat]:
-                    cat_map[cat][article["id"]] = article
-
-    # Build result sorted by article count descending; cap per category
-    categories = []
-    for cat_name in sorted(cat_order, key=lambda c: -len(cat_map[c])):
-        articles = list(cat_map[cat_name].values())
-        categories.append({
-            "name": cat_name,
-            "count": len(articles),
-            "articles": articles[:limit_per_category],
-        })
+        cat_name = article.pop("category")
+        count = article.pop("cnt")
+        if not categories or categories[-1]["name"] != cat_name:
+            categories.append({"name": cat_name, "count": count, "articles": []})
+        categories[-1]["articles"].append(article)
 
     return categories
 
@@ -1350,9 +2283,10 @@ def get_categorized_articles(limit_per_category=10, since_days=None):
 def _compute_category_hash(articles):
     """Compute a content hash for cache invalidation.
 
-    Produces a truncated SHA-256 hash of sorted ``(article_id,
-    summary_length)`` tuples so that adding or modifying articles
-    invalidates the cached insight.
+    Produces a truncated SHA-256 hash of ``(article_id, summary_length)``
+    pairs sorted by ID so that adding or modifying articles invalidates
+    the cached insight. The pairs are packed into a flat int64 buffer and
+    hashed in one call rather than formatted through ``str()``.
 
     Args:
         articles: List of article dicts with ``id`` and ``summary_text``.
@@ -1360,18 +2294,21 @@ def _compute_category_hash(articles):
     Returns:
         A 16-character hex string.
     """
-    tuples = sorted(
+    packed = array("q")
+    for art_id, summary_len in sorted(
         (a["id"], len(a.get("summary_text") or "")) for a in articles
-    )
-    raw = str(tuples).encode()
-    return hashlib.sha256(raw).hexdigest()[:16]
+    ):
+        packed.append(art_id)
+        packed.append(summary_len)
+    return hashlib.sha256(packed.tobytes()).hexdigest()[:16]
 
 
 def get_articles_for_category(category_name, subcategory_tag=None, since_days=None):
     """Return all summarized articles belonging to a broad category.
 
-    Scans all articles with tags and filters to those whose tags map
-    to the given category via ``_tag_to_category``.
+    Considers the 500 most recent tagged articles and keeps those with a
+    tag that maps to the given category (``article_tags.category``, see
+    ``_tag_to_category``).
 
     Args:
         category_name: Broad category name (e.g. ``"Malware"``).
@@ -1384,50 +2321,48 @@ def get_articles_for_category(category_name, subcategory_tag=None, since_days=No
         List of article dicts with summary data, ordered by
         publication date descending.
     """
-    conn = get_connection()
+    conn = get_reader()
     params = []
     date_filter = ""
     if since_days:
         date_filter = f" AND date(a.published_date) >= date('now', ?)"
         params.append(f"-{since_days} days")
+    params.append(category_name)
+    sub_filter = ""
+    if subcategory_tag:
+        # Entity tag and subcategory match if either contains the other
+        sub_filter = (
+            " AND (instr(lower(trim(t.tag)), ?) > 0"
+            " OR instr(?, lower(trim(t.tag))) > 0)"
+        )
+        sub_lower = subcategory_tag.strip().lower()
+        params.extend([sub_lower, sub_lower])
     rows = conn.execute(
         f"""
-        SELECT a.id, a.title, a.url, a.published_date,
-               sm.summary_text, sm.tags
-        FROM articles a
-        JOIN summaries sm ON sm.article_id = a.id
-        WHERE sm.tags IS NOT NULL AND sm.tags != '[]'{date_filter}
-        ORDER BY a.published_date DESC NULLS LAST, a.fetched_date DESC
-        LIMIT 500
+        WITH recent AS (
+            SELECT a.id, a.title, a.url, a.published_date,
+                   sm.summary_text, sm.tags,
+                   ROW_NUMBER() OVER (
+                       ORDER BY a.published_date IS NULL, a.published_date DESC,
+                                a.fetched_date DESC
+                   ) AS pos
+            FROM articles a
+            JOIN summaries sm ON sm.article_id = a.id
+            WHERE sm.tags IS NOT NULL AND sm.tags != '[]'{date_filter}
+            ORDER BY pos
+            LIMIT 500
+        )
+        SELECT id, title, url, published_date, summary_text, tags
+        FROM recent r
+        WHERE EXISTS (
+            SELECT 1 FROM article_tags t
+            WHERE t.article_id = r.id AND t.category = ?{sub_filter}
+        )
+        ORDER BY pos
         """,
         params,
     ).fetchall()
-
-    articles = []
-    seen_ids = set()
-    sub_lower = subcategory_tag.strip().lower() if subcategory_tag else None
-
-    for row in rows:
-        article = dict(row)
-        try:
-            tags = _json.loads(article.get("tags") or "[]")
-        except (_json.JSONDecodeError, TypeError):
-            tags = []
-
-        for tag in tags:
-            cat = _tag_to_category(tag)
-            if cat != category_name:
-                continue
-            if sub_lower is not None:
-                tag_lower = tag.strip().lower()
-                if not (sub_lower in tag_lower or tag_lower in sub_lower):
-                    continue
-            if article["id"] not in seen_ids:
-                seen_ids.add(article["id"])
-                articles.append(article)
-                break
-
-    return articles
+    return [dict(r) for r in rows]
 
 
 def get_category_insight(category_name):
@@ -1441,7 +2376,7 @@ def get_category_insight(category_name):
         A dict with all ``category_insights`` columns, or None if
         no cached insight exists.
     """
-    conn = get_connection()
+    conn = get_reader()
     row = conn.execute(
         "SELECT * FROM category_insights WHERE category_name = ?",
         (category_name,),
@@ -1449,6 +2384,30 @@ def get_category_insight(category_name):
     return dict(row) if row else None
 
 
+def get_fresh_category_insight(category_name, article_hash, max_age_seconds=24 * 3600):
+    """Fetch a cached insight only if it is still valid.
+
+    Hash match and age are checked in SQL, so stale rows never reach Python.
+
+    Args:
+        category_name: The cache key (see ``get_category_insight``).
+        article_hash: The current article-set hash; must equal the cached one.
+        max_age_seconds: Maximum age of the cached insight.
+
+    Returns:
+        A dict with all ``category_insights`` columns, or None if there is
+        no fresh insight for this key and hash.
+    """
+    conn = get_reader()
+    row = conn.execute(
+        "SELECT * FROM category_insights "
+        "WHERE category_name = ? AND article_hash = ? "
+        "AND created_ts > CAST(strftime('%s', 'now') AS INTEGER) - ?",
+        (category_name, article_hash, int(max_age_seconds)),
+    ).fetchone()
+    return dict(row) if row else None
+
+
 def save_category_insight(category_name, trend_text, forecast_text,
                           article_count, article_hash, model_used):
     """Upsert a category insight into the cache.
@@ -1465,12 +2424,14 @@ def save_category_insight(category_name, trend_text, forecast_text,
     conn = get_connection()
     conn.execute(
         "INSERT INTO category_insights "
-        "(category_name, trend_text, forecast_text, article_count, article_hash, model_used, created_date) "
-        "VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP) "
+        "(category_name, trend_text, forecast_text, article_count, article_hash, model_used, "
+        "created_date, created_ts) "
+        "VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CAST(strftime('%s', 'now') AS INTEGER)) "
         "ON CONFLICT(category_name) DO UPDATE SET "
         "trend_text=excluded.trend_text, forecast_text=excluded.forecast_text, "
         "article_count=excluded.article_count, article_hash=excluded.article_hash, "
-        "model_used=excluded.model_used, created_date=CURRENT_TIMESTAMP",
+        "model_used=excluded.model_used, created_date=excluded.created_date, "
+        "created_ts=excluded.created_ts",
         (category_name, trend_text, forecast_text, article_count, article_hash, model_used),
     )
     conn.commit()
@@ -1479,71 +2440,47 @@ def save_category_insight(category_name, trend_text, forecast_text,
 def delete_article(article_id):
     """Delete an article and all its related records.
 
-    Removes the article's embeddings, summary, correlations, and
-    finally the article row itself.
+    The ``articles_delete_cascade`` trigger removes the article's
+    embeddings, content, summary and correlations and clears duplicate
+    links pointing at it, all within the one statement.
 
     Args:
         article_id: The article's integer ID.
     """
     conn = get_connection()
-    conn.execute("DELETE FROM article_embeddings WHERE article_id = ?", (article_id,))
-    conn.execute("DELETE FROM article_dedup_embeddings WHERE article_id = ?", (article_id,))
-    conn.execute("DELETE FROM summaries WHERE article_id = ?", (article_id,))
-    conn.execute(
-        "DELETE FROM article_correlations WHERE article_id_1 = ? OR article_id_2 = ?",
-        (article_id, article_id),
-    )
-    # Un-mark any article that pointed to this one as its duplicate representative.
-    conn.execute("UPDATE articles SET duplicate_of_id = NULL WHERE duplicate_of_id = ?", (article_id,))
     conn.execute("DELETE FROM articles WHERE id = ?", (article_id,))
     conn.commit()
+    _bump_summaries_version()
 
 
-def delete_file_url_articles():
+def delete_file_url_articles(unscraped_only=False):
     """Delete articles whose URLs point to downloadable files.
 
-    Scans all articles and removes those with file-based URLs
-    (PDF, DOC, ZIP, etc.) that cannot be meaningfully scraped.
-    Also deletes their associated embeddings, summaries, and
-    correlations.
+    Removes articles with file-based URLs (PDF, DOC, ZIP, etc.) that
+    cannot be meaningfully scraped, matched in SQL via ``is_file_url``.
+    Their embeddings, summaries and correlations go with them (see
+    ``delete_article``).
+
+    Args:
+        unscraped_only: If True, only consider articles with no
+            ``content_raw`` yet (the scraper's queue).
 
     Returns:
         Number of articles deleted.
     """
-    from urllib.parse import urlparse
-
-    skip_ext = {
-        ".pdf", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx",
-        ".zip", ".rar", ".7z", ".gz", ".tar", ".tgz",
-        ".exe", ".msi", ".dmg", ".apk", ".iso",
-    }
     conn = get_connection()
-    rows = conn.execute("SELECT id, url FROM articles").fetchall()
-
-    ids = []
-    for row in rows:
-        try:
-            path = urlparse(row["url"]).path.lower()
-            if any(path.endswith(ext) for ext in skip_ext):
-                ids.append(row["id"])
-        except Exception:
-            continue
-
-    if not ids:
-        return 0
-
-    ph = ",".join("?" * len(ids))
-    conn.execute(f"DELETE FROM article_embeddings WHERE article_id IN ({ph})", ids)
-    conn.execute(f"DELETE FROM article_dedup_embeddings WHERE article_id IN ({ph})", ids)
-    conn.execute(f"DELETE FROM summaries WHERE article_id IN ({ph})", ids)
-    conn.execute(
-        f"DELETE FROM article_correlations WHERE article_id_1 IN ({ph}) OR article_id_2 IN ({ph})",
-        ids + ids,
-    )
-    conn.execute(f"UPDATE articles SET duplicate_of_id = NULL WHERE duplicate_of_id IN ({ph})", ids)
-    conn.execute(f"DELETE FROM articles WHERE id IN ({ph})", ids)
+    where = "is_file_url(url)"
+    if unscraped_only:
+        where = (
+            "NOT EXISTS (SELECT 1 FROM article_contents ac "
+            "WHERE ac.article_id = articles.id) AND " + where
+        )
+    # Dependent rows go with each article via articles_delete_cascade
+    deleted = conn.execute(f"DELETE FROM articles WHERE {where}").rowcount
     conn.commit()
-    return len(ids)
+    if deleted:
+        _bump_summaries_version()
+    return deleted
 
 
 def clear_database():
@@ -1556,6 +2493,7 @@ def clear_database():
     conn.executescript("""
         DELETE FROM article_embeddings;
         DELETE FROM article_dedup_embeddings;
+        DELETE FROM article_contents;
         DELETE FROM trend_analyses;
         DELETE FROM category_insights;
         DELETE FROM article_correlations;
@@ -1566,6 +2504,8 @@ def clear_database():
         UPDATE sources SET last_fetched = NULL;
     """)
     conn.commit()
+    _bump_summaries_version()
+    _bump_sources_version()
 
 
 def clear_articles_before_days(days):
@@ -1580,27 +2520,14 @@ def clear_articles_before_days(days):
         Number of articles deleted.
     """
     conn = get_connection()
-    cutoff = f"-{int(days)} days"
-    rows = conn.execute(
-        "SELECT id FROM articles WHERE fetched_date < datetime('now', ?)",
-        (cutoff,),
-    ).fetchall()
-    ids = [r[0] for r in rows]
-    if not ids:
-        return 0
-    ph = ",".join("?" * len(ids))
-    conn.execute(f"DELETE FROM article_embeddings WHERE article_id IN ({ph})", ids)
-    conn.execute(f"DELETE FROM article_dedup_embeddings WHERE article_id IN ({ph})", ids)
-    conn.execute(f"DELETE FROM summaries WHERE article_id IN ({ph})", ids)
-    conn.execute(
-        f"DELETE FROM article_correlations "
-        f"WHERE article_id_1 IN ({ph}) OR article_id_2 IN ({ph})",
-        ids + ids,
-    )
-    conn.execute(f"UPDATE articles SET duplicate_of_id = NULL WHERE duplicate_of_id IN ({ph})", ids)
-    conn.execute(f"DELETE FROM articles WHERE id IN ({ph})", ids)
+    deleted = conn.execute(
+        "DELETE FROM articles WHERE fetched_date < datetime('now', ?)",
+        (f"-{int(days)} days",),
+    ).rowcount
     conn.commit()
-    return len(ids)
+    if deleted:
+        _bump_summaries_version()
+    return deleted
 
 
 def delete_article_summary(article_id):
@@ -1613,17 +2540,7 @@ def delete_article_summary(article_id):
     Args:
         article_id: The article's integer ID.
     """
-    conn = get_connection()
-    conn.execute("DELETE FROM article_embeddings WHERE article_id = ?", (article_id,))
-    conn.execute("DELETE FROM article_dedup_embeddings WHERE article_id = ?", (article_id,))
-    conn.execute(
-        "DELETE FROM article_correlations WHERE article_id_1 = ? OR article_id_2 = ?",
-        (article_id, article_id),
-    )
-    conn.execute("DELETE FROM summaries WHERE article_id = ?", (article_id,))
-    conn.execute("UPDATE articles SET duplicate_of_id = NULL WHERE duplicate_of_id = ?", (article_id,))
-    conn.execute("DELETE FROM articles WHERE id = ?", (article_id,))
-    conn.commit()
+    delete_article(article_id)
 
 
 def update_article_tags(article_id, tags):
@@ -1663,6 +2580,7 @@ def update_article_tags(article_id, tags):
             (article_id, tags_json),
         )
     conn.commit()
+    _bump_summaries_version()
 
 
 def get_available_tags():
@@ -1717,7 +2635,7 @@ def get_trend_analyses(category_name):
     Returns:
         List of row dicts ordered by ``period_type, period_label``.
     """
-    conn = get_connection()
+    conn = get_reader()
     rows = conn.execute(
         "SELECT * FROM trend_analyses WHERE category_name = ? ORDER BY period_type, period_label",
         (category_name,),
@@ -1736,7 +2654,7 @@ def get_trend_analysis(category_name, period_type, period_label):
     Returns:
         Row dict or None.
     """
-    conn = get_connection()
+    conn = get_reader()
     row = conn.execute(
         "SELECT * FROM trend_analyses WHERE category_name = ? AND period_type = ? AND period_label = ?",
         (category_name, period_type, period_label),
@@ -1778,7 +2696,7 @@ def save_trend_analysis(category_name, period_type, period_label, trend_text, ar
 
 def get_last_digest_sent_at():
     """Return the ISO timestamp of the most recent digest, or None."""
-    conn = get_connection()
+    conn = get_reader()
     row = conn.execute(
         "SELECT sent_at FROM digest_log ORDER BY id DESC LIMIT 1"
     ).fetchone()
@@ -1811,7 +2729,7 @@ def get_articles_with_embeddings_since(since_dt):
         List of dicts with keys: id, title, url, source_name, summary_text,
         executive_summary, details, mitigations, embedding (bytes blob).
     """
-    conn = get_connection()
+    conn = get_reader()
     rows = conn.execute(
         """
         SELECT a.id, a.title, a.url, s.name AS source_name,
@@ -1,29 +1,38 @@
 import logging
+import random
 import struct
 import time
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 
 import numpy as np
 from openai import APIError, RateLimitError
 
-from config import load_config
+from config import get_config_value, load_config
 from database import (
-    get_all_embeddings,
-    get_article_ids_since_days,
+    batch,
+    decode_embedding,
+    encode_embedding,
     get_articles_by_ids,
     get_dedup_candidates,
     get_dedup_reference_embeddings,
     get_unembedded_articles,
+    iter_embedding_tiles,
+    nearest_articles,
     save_correlation,
     save_dedup_embedding,
-    save_embedding,
+    save_embeddings,
     set_duplicate_of,
 )
+from llm_client import get_openai_client
 
 logger = logging.getLogger(__name__)
 
 EMBEDDING_MODEL = "text-embedding-3-small"
 EMBEDDING_DIMS = 1536
+EMBEDDING_MAX_ATTEMPTS = 3
+# Longest honoured Retry-After; these calls run on the scheduler thread
+EMBEDDING_MAX_RETRY_WAIT = 60
 
 # Dedup tuning (mirrors the Android port's DeduplicateArticlesUseCase)
 DEDUP_WINDOW_HOURS = 24
@@ -32,47 +41,78 @@ DEDUP_EMBED_BATCH = 50
 
 
 def _get_client():
-    """Create an OpenAI client using the configured API key.
+    """Return the shared OpenAI client for the configured API key.
 
     Returns:
         An ``OpenAI`` client instance, or None if no API key is configured.
     """
-    config = load_config()
-    api_key = config.get("openai_api_key", "").strip()
+    api_key = (get_config_value("openai_api_key") or "").strip()
     if not api_key:
         return None
-    from openai import OpenAI
-    return OpenAI(api_key=api_key)
+    return get_openai_client(api_key)
 
 
 def _floats_to_blob(floats):
-    """Convert a list of floats to a raw bytes BLOB.
+    """Convert a list of floats to a stored embedding BLOB.
 
     Args:
         floats: List of float values (embedding vector).
 
     Returns:
-        Bytes object containing the float32 numpy array.
+        Bytes object holding the int8-quantized vector (see
+        ``database.encode_embedding``).
     """
-    return np.array(floats, dtype=np.float32).tobytes()
+    return encode_embedding(floats)
 
 
 def _blob_to_array(blob):
-    """Convert a raw bytes BLOB back to a numpy float32 array.
+    """Convert a stored embedding BLOB back to a numpy float32 array.
 
     Args:
-        blob: Bytes object containing a float32 numpy array.
+        blob: Embedding BLOB, int8-quantized or legacy float32.
 
     Returns:
         A numpy ndarray of dtype float32.
     """
-    return np.frombuffer(blob, dtype=np.float32)
+    return decode_embedding(blob)
+
+
+def _retry_after_seconds(exc):
+    """Return the server's ``Retry-After`` delay for an API error, if any.
+
+    Args:
+        exc: An ``openai`` exception, possibly carrying an HTTP response.
+
+    Returns:
+        Non-negative seconds as a float, or None if the header is absent
+        or unparseable. Both delta-seconds and HTTP-date forms are accepted.
+    """
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    value = headers.get("retry-after") if headers is not None else None
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
 
 
 def generate_embeddings_batch(texts):
     """Generate embeddings for a batch of texts via the OpenAI API.
 
-    Retries up to 3 times on rate limits or API errors.
+    Makes up to ``EMBEDDING_MAX_ATTEMPTS`` attempts; the SDK's own retries
+    are disabled for these calls so only this loop retries. Rate limits
+    wait for the server's ``Retry-After`` when given (capped at
+    ``EMBEDDING_MAX_RETRY_WAIT``), otherwise a jittered exponential
+    backoff; connection errors, timeouts and 5xx responses retry after a
+    short pause, other 4xx errors are not retried.
 
     Args:
         texts: List of text strings to embed.
@@ -86,21 +126,36 @@ def generate_embeddings_batch(texts):
         logger.warning("OpenAI API key not configured, skipping embedding generation")
         return None
 
-    for attempt in range(3):
+    client = client.with_options(max_retries=0)
+    for attempt in range(EMBEDDING_MAX_ATTEMPTS):
+        last_attempt = attempt == EMBEDDING_MAX_ATTEMPTS - 1
         try:
             response = client.embeddings.create(
                 model=EMBEDDING_MODEL,
                 input=texts,
             )
             return [item.embedding for item in response.data]
-        except RateLimitError:
-            wait = 2 ** (attempt + 1)
-            logger.warning(f"Rate limited, waiting {wait}s before retry")
+        except RateLimitError as e:
+            if last_attempt:
+                logger.error(f"Rate limited on final embedding attempt: {e}")
+                break
+            wait = _retry_after_seconds(e)
+            if wait is None:
+                wait = random.uniform(0.5, 1.0) * 2 ** (attempt + 1)
+            elif wait > EMBEDDING_MAX_RETRY_WAIT:
+                logger.warning(
+                    f"Retry-After of {wait:.0f}s exceeds {EMBEDDING_MAX_RETRY_WAIT}s, capping"
+                )
+                wait = EMBEDDING_MAX_RETRY_WAIT
+            logger.warning(f"Rate limited, waiting {wait:.1f}s before retry")
             time.sleep(wait)
         except APIError as e:
+            status = getattr(e, "status_code", None)
             logger.error(f"Embedding API error (attempt {attempt + 1}): {e}")
-            if attempt < 2:
-                time.sleep(1)
+            if status is not None and status < 500 and status not in (408, 409):
+                break  # Bad request / auth: retrying cannot help
+            if not last_attempt:
+                time.sleep(random.uniform(0.5, 1.5))
         except Exception as e:
             logger.error(f"Unexpected error during embedding generation: {e}")
             return None
@@ -120,7 +175,8 @@ def embed_pending_articles(limit=50, article_ids=None):
         article_ids: Optional list of article IDs to restrict processing to.
 
     Returns:
-        Total number of articles processed (0 means nothing left).
+        Total number of articles processed (0 means nothing left, or the
+        batch could not be embedded or stored).
     """
     articles = get_unembedded_articles(limit=limit, article_ids=article_ids)
     if not articles:
@@ -137,16 +193,17 @@ def embed_pending_articles(limit=50, article_ids=None):
     if embeddings is None:
         return 0
 
-    stored = 0
-    for art, emb in zip(articles, embeddings):
-        try:
-            blob = _floats_to_blob(emb)
-            save_embedding(art["id"], blob, EMBEDDING_MODEL)
-            stored += 1
-        except Exception as e:
-            logger.error(f"Failed to save embedding for article {art['id']}: {e}")
+    rows = [
+        (art["id"], _floats_to_blob(emb), EMBEDDING_MODEL)
+        for art, emb in zip(articles, embeddings)
+    ]
+    try:
+        save_embeddings(rows)
+    except Exception as e:
+        logger.error(f"Failed to save {len(rows)} embeddings: {e}")
+        return 0
 
-    logger.info(f"Generated embeddings for {stored}/{len(articles)} articles")
+    logger.info(f"Generated embeddings for {len(rows)}/{len(articles)} articles")
     return len(articles)
 
 
@@ -219,17 +276,18 @@ def deduplicate_pending_articles():
         if embeddings is None:
             logger.warning("Embedding generation failed during dedup, aborting dedup pass")
             return 0
-        for cand, emb in zip(chunk, embeddings):
-            blob = _floats_to_blob(emb)
-            try:
-                save_dedup_embedding(cand["id"], blob, EMBEDDING_MODEL)
-            except Exception as e:
-                logger.error(f"Failed to save dedup embedding for article {cand['id']}: {e}")
-            vec = _blob_to_array(blob).astype(np.float32)
-            norm = np.linalg.norm(vec)
-            if norm == 0:
-                continue
-            embedded.append((cand, vec / norm))
+        with batch():
+            for cand, emb in zip(chunk, embeddings):
+                blob = _floats_to_blob(emb)
+                try:
+                    save_dedup_embedding(cand["id"], blob, EMBEDDING_MODEL)
+                except Exception as e:
+                    logger.error(f"Failed to save dedup embedding for article {cand['id']}: {e}")
+                vec = _blob_to_array(blob).astype(np.float32)
+                norm = np.linalg.norm(vec)
+                if norm == 0:
+                    continue
+                embedded.append((cand, vec / norm))
 
     if not embedded:
         return 0
@@ -311,7 +369,7 @@ def cluster_articles_by_similarity(articles, threshold=0.82):
 
     Args:
         articles: List of article dicts, each containing an ``embedding`` key
-            with raw float32 bytes (as returned by ``get_articles_with_embeddings_since``).
+            with the stored embedding BLOB (as returned by ``get_articles_with_embeddings_since``).
         threshold: Cosine similarity threshold for merging into an existing cluster.
 
     Returns:
@@ -361,29 +419,55 @@ def cluster_articles_by_similarity(articles, threshold=0.82):
     return clusters
 
 
-def semantic_search(query, top_k=15, since_days=None):
-    """Perform semantic search over stored article embeddings.
+def _rank_with_matrix(query_embedding, top_k, since_days):
+    """Rank stored embeddings against a query by cosine similarity in numpy.
 
-    Embeds the query string, computes cosine similarity against all
-    stored article embeddings, and returns the top-K most similar
-    articles with their relevance scores.
+    Embeddings are scored a tile at a time (see
+    ``database.iter_embedding_tiles``) while a running top-K is kept, so
+    the full ``(N, 1536)`` matrix is never materialised.
 
     Args:
-        query: The natural-language search query.
+        query_embedding: Non-zero float32 query vector.
         top_k: Number of top results to return.
-        since_days: If set, restrict search to articles published within
-            this many days. None means search all articles.
+        since_days: Optional publication window, as for ``semantic_search``.
 
     Returns:
-        List of article dicts, each augmented with a ``relevance_score``
-        float (0.0--1.0). Returns an empty list if no API key is
-        configured or no embeddings exist.
+        A ``(ranked_ids, ranked_scores)`` pair of lists, best match first.
+    """
+    # Stored rows decode unit-norm, so cosine similarity is a bare dot product
+    query_unit = query_embedding / np.linalg.norm(query_embedding)
+
+    best_ids = np.empty(0, dtype=np.int64)
+    best_scores = np.empty(0, dtype=np.float32)
+    for tile_ids, tile in iter_embedding_tiles(model_used=EMBEDDING_MODEL, since_days=since_days):
+        ids = np.concatenate((best_ids, tile_ids))
+        scores = np.concatenate((best_scores, tile @ query_unit))
+        # Keep the running top-K by partial selection
+        if len(scores) > top_k:
+            keep = np.argpartition(-scores, top_k)[:top_k]
+            ids, scores = ids[keep], scores[keep]
+        best_ids, best_scores = ids, scores
+
+    order = np.argsort(-best_scores)
+    ranked_ids = [int(best_ids[i]) for i in order]
+    ranked_scores = [float(best_scores[i]) for i in order]
+    return ranked_ids, ranked_scores
+
+
+def embed_query(query):
+    """Embed a search query with the configured embedding model.
+
+    Args:
+        query: The natural-language search query.
+
+    Returns:
+        A non-zero float32 numpy vector, or None if no API key is
+        configured, the request fails, or the model returns a zero vector.
     """
     client = _get_client()
     if client is None:
-        return []
+        return None
 
-    # Embed the query
     try:
         response = client.embeddings.create(
             model=EMBEDDING_MODEL,
@@ -392,42 +476,49 @@ def semantic_search(query, top_k=15, since_days=None):
         query_embedding = np.array(response.data[0].embedding, dtype=np.float32)
     except Exception as e:
         logger.error(f"Failed to embed query: {e}")
-        return []
+        return None
 
-    # Load all stored embeddings, optionally filtered by time period
-    all_embs = get_all_embeddings(model_used=EMBEDDING_MODEL)
-    if not all_embs:
-        return []
+    if not np.any(query_embedding):
+        return None
+    return query_embedding
 
-    if since_days is not None:
-        allowed_ids = get_article_ids_since_days(since_days, model_used=EMBEDDING_MODEL)
-        all_embs = [e for e in all_embs if e["article_id"] in allowed_ids]
-        if not all_embs:
-            return []
 
-    # Build matrix for vectorized cosine similarity
-    article_ids = []
-    matrix_rows = []
-    for row in all_embs:
-        article_ids.append(row["article_id"])
-        matrix_rows.append(_blob_to_array(row["embedding"]))
+def semantic_search(query, top_k=15, since_days=None, query_embedding=None):
+    """Perform semantic search over stored article embeddings.
 
-    matrix = np.vstack(matrix_rows)  # shape: (N, 1536)
+    Embeds the query string, finds the most similar stored article
+    embeddings by cosine similarity (in SQLite via ``nearest_articles``
+    when sqlite-vec is installed, otherwise in numpy), and returns the
+    top-K articles with their relevance scores.
 
-    # Cosine similarity: dot(q, M^T) / (|q| * |M_rows|)
-    query_norm = np.linalg.norm(query_embedding)
-    if query_norm == 0:
-        return []
-    row_norms = np.linalg.norm(matrix, axis=1)
-    # Avoid division by zero
-    row_norms = np.where(row_norms == 0, 1e-10, row_norms)
-    similarities = matrix @ query_embedding / (row_norms * query_norm)
+    Args:
+        query: The natural-language search query.
+        top_k: Number of top results to return.
+        since_days: If set, restrict search to articles published within
+            this many days. None means search all articles.
+        query_embedding: Optional vector from ``embed_query`` for callers
+            that already embedded the query; skips the embedding request.
 
-    # Get top-K indices
-    top_indices = np.argsort(similarities)[::-1][:top_k]
+    Returns:
+        List of article dicts, each augmented with a ``relevance_score``
+        float (0.0--1.0). Returns an empty list if no API key is
+        configured or no embeddings exist.
+    """
+    if query_embedding is None:
+        query_embedding = embed_query(query)
+    if query_embedding is None:
+        return []
 
-    ranked_ids = [article_ids[i] for i in top_indices]
-    ranked_scores = [float(similarities[i]) for i in top_indices]
+    # In-engine KNN when sqlite-vec is available; installs without the
+    # extension score the matrix in numpy.
+    hits = nearest_articles(query_embedding, top_k, since_days=since_days)
+    if hits is not None:
+        ranked_ids = [article_id for article_id, _ in hits]
+        ranked_scores = [float(sim) for _, sim in hits]
+    else:
+        ranked_ids, ranked_scores = _rank_with_matrix(query_embedding, top_k, since_days)
+    if not ranked_ids:
+        return []
 
     # Fetch full article data preserving rank order
     articles = get_articles_by_ids(ranked_ids)
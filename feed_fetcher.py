@@ -1,19 +1,24 @@
 import logging
 import socket
+from calendar import timegm
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from time import mktime
-from urllib.parse import urlparse
 
 import feedparser
 import requests
 
 from config import load_config
 from database import (
-    article_exists,
+    batch,
+    existing_article_urls,
+    flush_source_fetched,
+    get_source_cache_headers,
     get_source_id,
     get_source_last_fetched,
-    insert_article,
+    insert_articles,
+    is_file_url,
+    mark_source_fetched,
+    update_source_cache_headers,
     update_source_fetched,
     upsert_source,
 )
@@ -29,33 +34,23 @@ FEED_HEADERS = {
     "Accept": "application/rss+xml, application/xml, text/xml, application/atom+xml, */*;q=0.8",
 }
 
-_SKIP_EXTENSIONS = frozenset({
-    ".pdf", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx",
-    ".zip", ".rar", ".7z", ".gz", ".tar", ".tgz",
-    ".exe", ".msi", ".dmg", ".apk", ".iso",
-})
-
-
-def _is_file_url(url):
-    """Check whether a URL points to a downloadable file.
-
-    Args:
-        url: The URL string to inspect.
-
-    Returns:
-        bool: True if the URL path ends with a known file extension.
-    """
-    try:
-        path = urlparse(url).path.lower()
-        return any(path.endswith(ext) for ext in _SKIP_EXTENSIONS)
-    except Exception:
-        return False
+MAX_FEED_WORKERS = 5
 
+# Shared keep-alive session; the per-host pool is sized to the fetch pool
+_session = requests.Session()
+_session.headers.update(FEED_HEADERS)
+_adapter = requests.adapters.HTTPAdapter(
+    pool_connections=MAX_FEED_WORKERS * 2, pool_maxsize=MAX_FEED_WORKERS
+)
+_session.mount("http://", _adapter)
+_session.mount("https://", _adapter)
 
 def _parse_date(entry):
     """Extract a UTC datetime from a feedparser entry.
 
     Checks ``published_parsed`` first, then ``updated_parsed``.
+    feedparser normalises both to UTC, so they are converted with
+    ``timegm`` rather than the local-time ``mktime``.
 
     Args:
         entry: A feedparser entry object.
@@ -68,7 +63,7 @@ def _parse_date(entry):
         parsed = getattr(entry, attr, None)
         if parsed:
             try:
-                return datetime.utcfromtimestamp(mktime(parsed))
+                return datetime.utcfromtimestamp(timegm(parsed))
             except (ValueError, OverflowError):
                 continue
     return None
@@ -87,11 +82,15 @@ def _get_cutoff(lookback_days=1):
     return datetime.utcnow() - timedelta(days=lookback_days)
 
 
+_IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".gif")
+
+
 def _extract_image(entry):
     """Extract a thumbnail or hero image URL from a feedparser entry.
 
-    Tries ``media:thumbnail``, then ``media:content`` with image medium,
-    then enclosures with an ``image/*`` MIME type.
+    Tries ``media:thumbnail``, then ``media:content`` with image medium
+    or an image file extension, then enclosures with an ``image/*`` MIME
+    type, returning the first hit.
 
     Args:
         entry: A feedparser entry object.
@@ -99,19 +98,14 @@ def _extract_image(entry):
     Returns:
         str or None: The image URL, or None if no image is found.
     """
-    # Try media:thumbnail
     media = entry.get("media_thumbnail")
-    if media and len(media) > 0:
+    if media:
         return media[0].get("url")
-    # Try media:content
-    media_content = entry.get("media_content")
-    if media_content:
-        for m in media_content:
-            if m.get("medium") == "image" or (m.get("url", "").endswith((".jpg", ".png", ".webp"))):
-                return m.get("url")
-    # Try enclosures
-    enclosures = entry.get("enclosures", [])
-    for enc in enclosures:
+    for m in entry.get("media_content") or ():
+        url = m.get("url") or ""
+        if m.get("medium") == "image" or url.lower().endswith(_IMAGE_EXTENSIONS):
+            return m.get("url")
+    for enc in entry.get("enclosures") or ():
         if enc.get("type", "").startswith("image/"):
             return enc.get("href") or enc.get("url")
     return None
@@ -131,16 +125,31 @@ def _fetch_single_feed(feed_cfg, lookback_days, since_last_fetch):
         logger.info(f"Fetching feed: {name}")
 
         # Try fetching with feed-reader UA first, then fall back to
-        # feedparser's built-in fetcher (uses its own UA + etag/modified handling)
+        # feedparser's built-in fetcher (uses its own UA + etag/modified handling).
+        # Only entry titles, links, dates and media are read, so feedparser
+        # skips rewriting relative URIs inside entry HTML.
+        # On incremental runs, validators from the last 200 make an unchanged
+        # feed a bodiless 304; a lookback run re-reads the feed regardless.
+        etag, last_modified = get_source_cache_headers(source_id)
+        conditional = {}
+        if not since_last_fetch:
+            etag = last_modified = None
+        if etag:
+            conditional["If-None-Match"] = etag
+        if last_modified:
+            conditional["If-Modified-Since"] = last_modified
+
         parsed = None
+        validators = None
         try:
-            resp = requests.get(
-                url,
-                headers=FEED_HEADERS,
-                timeout=FEED_FETCH_TIMEOUT,
-            )
+            resp = _session.get(url, headers=conditional, timeout=FEED_FETCH_TIMEOUT)
+            if resp.status_code == 304:
+                mark_source_fetched(source_id)
+                logger.info(f"  {name}: not modified")
+                return 0
             resp.raise_for_status()
-            parsed = feedparser.parse(resp.content)
+            parsed = feedparser.parse(resp.content, resolve_relative_uris=False)
+            validators = (resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
         except requests.RequestException as e:
             logger.debug(f"Feed download with requests failed for {name}: {e}")
 
@@ -148,27 +157,31 @@ def _fetch_single_feed(feed_cfg, lookback_days, since_last_fetch):
         if parsed is None or (parsed.bozo and not parsed.entries):
             if parsed and parsed.bozo:
                 logger.debug(f"Parse failed for {name}, retrying with feedparser fetcher")
+            validators = None
             try:
                 _prev_timeout = socket.getdefaulttimeout()
                 socket.setdefaulttimeout(FEED_FETCH_TIMEOUT)
                 try:
-                    parsed = feedparser.parse(url)
+                    parsed = feedparser.parse(
+                        url, etag=etag, modified=last_modified, resolve_relative_uris=False
+                    )
                 finally:
                     socket.setdefaulttimeout(_prev_timeout)
             except Exception as e:
                 logger.warning(f"Failed to fetch feed {name}: {e}")
                 return 0
+            if parsed.get("status") == 304:
+                mark_source_fetched(source_id)
+                logger.info(f"  {name}: not modified")
+                return 0
 
         if parsed.bozo and not parsed.entries:
             logger.warning(f"Failed to parse feed {name}: {parsed.bozo_exception}")
             return 0
 
-        if since_last_fetch:
-            last_fetched = get_source_last_fetched(source_id)
-            if last_fetched:
-                cutoff = datetime.fromisoformat(last_fetched)
-            else:
-                cutoff = _get_cutoff(lookback_days)
+        last_fetched = get_source_last_fetched(source_id)
+        if since_last_fetch and last_fetched:
+            cutoff = datetime.fromisoformat(last_fetched)
         else:
             cutoff = _get_cutoff(lookback_days)
         new_count = 0
@@ -184,7 +197,7 @@ def _fetch_single_feed(feed_cfg, lookback_days, since_last_fetch):
             if not link or not title:
                 continue
 
-            if _is_file_url(link):
+            if is_file_url(link):
                 continue
 
             pub_date = _parse_date(entry)
@@ -195,43 +208,57 @@ def _fetch_single_feed(feed_cfg, lookback_days, since_last_fetch):
                 continue
 
             # Skip articles with no date if we've fetched this source before
-            if pub_date is None and get_source_last_fetched(source_id) is not None:
+            if pub_date is None and last_fetched is not None:
                 skipped_old += 1
                 continue
 
-            if article_exists(link):
-                continue
-
             candidates.append({
                 "title": title,
                 "link": link,
                 "pub_date": pub_date,
-                "author": entry.get("author"),
-                "image_url": _extract_image(entry),
+                "entry": entry,
             })
 
+        # One lookup for the whole feed instead of a query per entry; entries
+        # already stored never reach the author/image extraction
+        known = existing_article_urls(c["link"] for c in candidates)
+        candidates = [c for c in candidates if c["link"] not in known]
+        for c in candidates:
+            entry = c.pop("entry")
+            c["author"] = entry.get("author")
+            c["image_url"] = _extract_image(entry)
+
         # Batch-classify candidate titles using OpenAI LLM
         if candidates:
             titles = [c["title"] for c in candidates]
             relevance = check_relevance(titles)
 
-            for candidate, is_relevant in zip(candidates, relevance):
-                if not is_relevant:
-                    skipped_irrelevant += 1
-                    continue
-
-                article_id = insert_article(
-                    source_id=source_id,
-                    title=candidate["title"],
-                    url=candidate["link"],
-                    author=candidate["author"],
-                    published_date=candidate["pub_date"].isoformat() if candidate["pub_date"] else None,
-                    image_url=candidate["image_url"],
+            rows = [
+                (
+                    source_id,
+                    candidate["title"],
+                    candidate["link"],
+                    candidate["author"],
+                    candidate["pub_date"].isoformat() if candidate["pub_date"] else None,
+                    candidate["image_url"],
                 )
-                if article_id:
-                    new_count += 1
-
-        update_source_fetched(source_id)
+                for candidate, is_relevant in zip(candidates, relevance)
+                if is_relevant
+            ]
+            skipped_irrelevant = len(candidates) - len(rows)
+
+            # One transaction and one statement for the whole feed
+            with batch():
+                new_count = insert_articles(rows)
+                update_source_fetched(source_id)
+                # Stored only once the entries are in, so a failed run refetches
+                if validators and validators != (etag, last_modified):
+                    update_source_cache_headers(source_id, *validators)
+        else:
+            if validators and validators != (etag, last_modified):
+                update_source_cache_headers(source_id, *validators)
+            # Nothing else to write; flushed with the rest at the end of the cycle
+            mark_source_fetched(source_id)
         logger.info(f"  {name}: {new_count} new, {skipped_old} old, {skipped_irrelevant} irrelevant")
         return new_count
 
@@ -240,9 +267,6 @@ def _fetch_single_feed(feed_cfg, lookback_days, since_last_fetch):
         return 0
 
 
-MAX_FEED_WORKERS = 5
-
-
 def fetch_all_feeds(lookback_days=1, since_last_fetch=False):
     """Download and process all enabled RSS/Atom feeds in parallel.
 
@@ -277,5 +301,6 @@ def fetch_all_feeds(lookback_days=1, since_last_fetch=False):
             except Exception as e:
                 logger.error(f"Error fetching feed {name}: {e}")
 
+    flush_source_fetched()
     logger.info(f"Total new articles fetched: {total_new}")
     return total_new
@@ -2,11 +2,16 @@ import json
 import logging
 import math
 import re
+import threading
 import time
+from collections import OrderedDict
 
-from config import load_config
+import numpy as np
+
+from config import get_config_value, load_config
 from cost_tracker import cost_tracker
-from embeddings import semantic_search
+from database import get_summaries_version
+from embeddings import embed_query, semantic_search
 from llm_client import call_llm, get_model_name, has_api_key
 
 logger = logging.getLogger(__name__)
@@ -63,6 +68,91 @@ Guidelines for in-scope questions:
 MAX_CONTEXT_CHARS = 30000
 MAX_CONVERSATION_MESSAGES = 6
 
+# Static first system block, built once. It carries a 1-hour cache TTL
+# because it never changes across sessions; llm_client copies rather than
+# mutates system blocks, so the one dict is shared by every call.
+_SYSTEM_PROMPT_BLOCK = {
+    "type": "text",
+    "text": SYSTEM_PROMPT,
+    "cache_control": {"type": "ephemeral", "ttl": "1h"},
+}
+
+# Answer cache for single-turn questions, so a question repeated within
+# the TTL skips retrieval and the LLM call. Entries are keyed on the
+# normalised question text. Reusing the answer of a merely similar question
+# (cosine of the query embeddings) is opt-in through the
+# ``chat_cache_similarity`` setting, because short questions that differ in
+# one word ("ransomware on Linux" / "on Windows") embed very close together.
+# The cache is dropped whenever new summaries land, and cached results are
+# returned with ``"cached": True``.
+CHAT_CACHE_TTL = 600
+CHAT_CACHE_MAX_ENTRIES = 256
+
+_chat_cache_lock = threading.Lock()
+_chat_cache_version = None
+_chat_cache = OrderedDict()  # (text_key, params) -> entry, oldest first
+
+
+def _chat_cache_text_key(query):
+    """Normalise a question for the exact-match cache lookup."""
+    return " ".join(query.lower().split())
+
+
+def _chat_cache_prune(now):
+    """Drop stale entries. Caller must hold ``_chat_cache_lock``."""
+    global _chat_cache_version
+    version = get_summaries_version()
+    if version != _chat_cache_version:
+        _chat_cache_version = version
+        _chat_cache.clear()
+        return
+    while _chat_cache:
+        oldest = next(iter(_chat_cache.values()))
+        if now - oldest["ts"] <= CHAT_CACHE_TTL and len(_chat_cache) <= CHAT_CACHE_MAX_ENTRIES:
+            break
+        _chat_cache.popitem(last=False)
+
+
+def _chat_cache_lookup(text_key, params, query_unit=None, similarity=None):
+    """Return a cached chat result, or None on a miss.
+
+    Args:
+        text_key: Normalised question from ``_chat_cache_text_key``.
+        params: Tuple of the retrieval settings the answer depends on.
+        query_unit: Optional unit-norm query embedding for a near-duplicate
+            match.
+        similarity: Minimum cosine similarity for a near-duplicate match.
+            Only used together with ``query_unit``; None disables it.
+
+    Returns:
+        A copy of the cached result dict marked ``"cached": True``, or None.
+    """
+    with _chat_cache_lock:
+        _chat_cache_prune(time.time())
+        entry = _chat_cache.get((text_key, params))
+        if entry is None and query_unit is not None and similarity is not None:
+            candidates = [e for (_, p), e in _chat_cache.items() if p == params]
+            if candidates:
+                sims = np.stack([e["vector"] for e in candidates]) @ query_unit
+                best = int(np.argmax(sims))
+                if sims[best] >= similarity:
+                    entry = candidates[best]
+        if entry is None:
+            return None
+        result = entry["result"]
+    return {**result, "articles": list(result["articles"]), "cached": True}
+
+
+def _chat_cache_store(text_key, params, query_unit, result):
+    """Cache a successful single-turn chat result."""
+    with _chat_cache_lock:
+        now = time.time()
+        _chat_cache_prune(now)
+        key = (text_key, params)
+        _chat_cache.pop(key, None)
+        _chat_cache[key] = {"vector": query_unit, "result": result, "ts": now}
+        _chat_cache_prune(now)
+
 
 def _extract_since_days(query):
     """Extract a lookback window (in days) from natural-language time references.
@@ -146,7 +236,10 @@ def chat(messages, top_k=15, since_days=None):
     Extracts the latest user message, performs semantic search to find
     relevant articles, builds a context window, and sends everything
     to the OpenAI API for a synthesized response. Retries up to 3
-    times on rate limits or API errors.
+    times on rate limits or API errors. Single-turn questions are served
+    from a short-lived answer cache when the same question (or, with
+    ``chat_cache_similarity`` configured, a near-identical one) was
+    answered recently.
 
     Args:
         messages: List of conversation message dicts, each with
@@ -164,6 +257,8 @@ def chat(messages, top_k=15, since_days=None):
             - ``model_used``: The OpenAI model name used.
             - ``error``: Error string or None on success.
             - ``since_days``: The time window applied (int or None).
+            - ``cached``: Present and True only when the answer came from
+              the answer cache.
     """
     if not has_api_key():
         return {
@@ -177,8 +272,8 @@ def chat(messages, top_k=15, since_days=None):
     model = get_model_name()
 
     # Extract latest user message for retrieval
-    user_messages = [m for m in messages if m.get("role") == "user"]
-    if not user_messages:
+    last_user = next((m for m in reversed(messages) if m.get("role") == "user"), None)
+    if last_user is None:
         return {
             "response": "Please ask a question about threat intelligence.",
             "articles": [],
@@ -187,29 +282,50 @@ def chat(messages, top_k=15, since_days=None):
             "since_days": None,
         }
 
-    query = user_messages[-1]["content"]
+    query = last_user["content"]
 
     # Auto-detect time references if since_days not explicitly set; 0 means "all"
     effective_since = since_days if since_days is not None else _extract_since_days(query)
     if effective_since == 0:
         effective_since = None
 
+    # Add last N conversation messages for follow-up context (user/assistant only)
+    recent = [m for m in messages[-MAX_CONVERSATION_MESSAGES:] if m.get("role") in ("user", "assistant")]
+
+    # Only standalone questions are cached; a follow-up's answer depends
+    # on the earlier turns.
+    cacheable = len(recent) == 1
+    text_key = _chat_cache_text_key(query)
+    cache_params = (effective_since, top_k, model)
+    if cacheable:
+        cached = _chat_cache_lookup(text_key, cache_params)
+        if cached is not None:
+            return cached
+
+    query_embedding = embed_query(query)
+    query_unit = None
+    if query_embedding is not None:
+        query_unit = query_embedding / np.linalg.norm(query_embedding)
+        similarity = get_config_value("chat_cache_similarity")
+        if cacheable and similarity is not None:
+            cached = _chat_cache_lookup(text_key, cache_params, query_unit, float(similarity))
+            if cached is not None:
+                return cached
+
     # Semantic search for relevant articles (optionally time-filtered)
-    articles = semantic_search(query, top_k=top_k, since_days=effective_since)
+    articles = []
+    if query_embedding is not None:
+        articles = semantic_search(query, top_k=top_k, since_days=effective_since,
+                                   query_embedding=query_embedding)
 
     # Build context from retrieved articles
     context = _build_context(articles)
 
     # Split system into two blocks so the static instructions and the dynamic
     # article context can each be cached independently by the Anthropic API.
-    # SYSTEM_PROMPT uses a 1-hour TTL (it never changes across sessions).
     # The retrieved-articles block uses the default 5-minute TTL (changes per query).
     system_blocks = [
-        {
-            "type": "text",
-            "text": SYSTEM_PROMPT,
-            "cache_control": {"type": "ephemeral", "ttl": "1h"},
-        },
+        _SYSTEM_PROMPT_BLOCK,
         {
             "type": "text",
             "text": f"RETRIEVED ARTICLES:\n\n{context}",
@@ -217,9 +333,6 @@ def chat(messages, top_k=15, since_days=None):
         },
     ]
 
-    # Add last N conversation messages for follow-up context (user/assistant only)
-    recent = [m for m in messages[-MAX_CONVERSATION_MESSAGES:] if m.get("role") in ("user", "assistant")]
-
     for attempt in range(3):
         try:
             answer, it, ot, cc, cr = call_llm(
@@ -230,13 +343,17 @@ def chat(messages, top_k=15, since_days=None):
                 system_blocks=system_blocks,
             )
             cost_tracker.add_tokens(it, ot, cc, cr)
-            return {
+            result = {
                 "response": answer,
                 "articles": articles,
                 "model_used": model,
                 "error": None,
                 "since_days": effective_since,
             }
+            if cacheable and query_unit is not None:
+                _chat_cache_store(text_key, cache_params, query_unit, result)
+                return {**result, "articles": list(articles)}
+            return result
         except Exception as e:
             is_rate = "429" in str(e) or "rate limit" in str(e).lower() or type(e).__name__ == "RateLimitError"
             if is_rate:
@@ -1,28 +1,51 @@
 """Provider-aware LLM client abstraction supporting OpenAI and Anthropic."""
 
 import logging
+from functools import lru_cache
 
-from config import load_config
+from config import get_config_value, load_config
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=8)
+def get_openai_client(api_key):
+    """Return a shared ``OpenAI`` client for an API key.
+
+    Clients are thread-safe and keep their HTTP connection pool, so reusing
+    one per key avoids a fresh TLS handshake on every call.
+
+    Args:
+        api_key: The OpenAI API key.
+
+    Returns:
+        An ``OpenAI`` client instance.
+    """
+    from openai import OpenAI
+    return OpenAI(api_key=api_key)
+
+
+@lru_cache(maxsize=8)
+def _get_anthropic_client(api_key):
+    """Return a shared ``anthropic.Anthropic`` client for an API key."""
+    import anthropic
+    return anthropic.Anthropic(api_key=api_key)
+
+
 def has_api_key():
     """Return True if the configured LLM provider has an API key set."""
-    config = load_config()
-    provider = config.get("llm_provider", "openai")
+    provider = get_config_value("llm_provider", "openai")
     if provider == "anthropic":
-        return bool(config.get("anthropic_api_key", "").strip())
-    return bool(config.get("openai_api_key", "").strip())
+        return bool(get_config_value("anthropic_api_key", "").strip())
+    return bool(get_config_value("openai_api_key", "").strip())
 
 
 def get_model_name():
     """Return the active model name for the configured provider."""
-    config = load_config()
-    provider = config.get("llm_provider", "openai")
+    provider = get_config_value("llm_provider", "openai")
     if provider == "anthropic":
-        return config.get("anthropic_model", "claude-haiku-4-5-20251001")
-    return config.get("openai_model", "gpt-5.4-nano")
+        return get_config_value("anthropic_model", "claude-haiku-4-5-20251001")
+    return get_config_value("openai_model", "gpt-5.4-nano")
 
 
 def call_llm(system_prompt, messages, temperature=0.3, max_tokens=2000,
@@ -61,11 +84,9 @@ def call_llm(system_prompt, messages, temperature=0.3, max_tokens=2000,
 
 def _call_openai(system_prompt, messages, temperature, max_tokens, json_mode,
                  config, system_blocks=None):
-    from openai import OpenAI
-
     api_key = config.get("openai_api_key", "").strip()
     model = config.get("openai_model", "gpt-5.4-nano")
-    client = OpenAI(api_key=api_key)
+    client = get_openai_client(api_key)
 
     # Resolve system text: prefer system_blocks (join text fields), else system_prompt.
     if system_blocks:
@@ -126,7 +147,7 @@ def _call_anthropic(system_prompt, messages, temperature, max_tokens, json_mode,
 
     api_key = config.get("anthropic_api_key", "").strip()
     model = config.get("anthropic_model", "claude-haiku-4-5-20251001")
-    client = anthropic.Anthropic(api_key=api_key)
+    client = _get_anthropic_client(api_key)
 
     # Separate system-role messages from user/assistant messages.
     system_parts = []
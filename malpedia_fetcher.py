@@ -1,14 +1,15 @@
 import logging
 import re
 from datetime import datetime, timedelta
-from urllib.parse import urlparse
 
 import requests
 
 from config import load_config
 from database import (
-    article_exists,
-    insert_article,
+    batch,
+    existing_article_urls,
+    insert_articles,
+    is_file_url,
     update_source_fetched,
     upsert_source,
 )
@@ -20,29 +21,11 @@ MALPEDIA_BASE = "https://malpedia.caad.fkie.fraunhofer.de"
 MALPEDIA_BIB_URL = f"{MALPEDIA_BASE}/api/get/bib"
 MALPEDIA_SOURCE_URL = f"{MALPEDIA_BASE}/library"
 MALPEDIA_TIMEOUT = 60  # BibTeX payload is ~4.5 MB
+MALPEDIA_CHUNK_SIZE = 64 * 1024
 
-_SKIP_EXTENSIONS = frozenset({
-    ".pdf", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx",
-    ".zip", ".rar", ".7z", ".gz", ".tar", ".tgz",
-    ".exe", ".msi", ".dmg", ".apk", ".iso",
-})
-
-
-def _is_file_url(url):
-    """Check whether a URL points to a downloadable file.
-
-    Args:
-        url: The URL string to inspect.
-
-    Returns:
-        bool: True if the URL path ends with a known file extension.
-    """
-    try:
-        path = urlparse(url).path.lower()
-        return any(path.endswith(ext) for ext in _SKIP_EXTENSIONS)
-    except Exception:
-        return False
-
+# Shared keep-alive session; every request goes to the one Malpedia host
+_session = requests.Session()
+_session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=2))
 
 # Regex patterns for BibTeX field extraction
 _RE_ENTRY = re.compile(r"@\w+\{[^,]+,(.*?)\n\}", re.DOTALL)
@@ -53,11 +36,14 @@ _RE_AUTHOR = re.compile(r"author\s*=\s*\{(.+?)\}")
 _RE_ORG = re.compile(r"organization\s*=\s*\{(.+?)\}")
 
 
-def _parse_bibtex(text):
+def _parse_bibtex(text, min_date=None):
     """Parse BibTeX text and yield article metadata dicts.
 
     Args:
         text: Raw BibTeX string from the Malpedia API.
+        min_date: Optional ``YYYY-MM-DD`` string. When given, entries
+            without a date or dated before it are dropped after the date
+            search alone, before the other fields are extracted.
 
     Yields:
         dict: Entries with keys ``title``, ``date``, ``url``, ``author``,
@@ -66,6 +52,12 @@ def _parse_bibtex(text):
     for match in _RE_ENTRY.finditer(text):
         body = match.group(1)
 
+        date_m = _RE_DATE.search(body)
+        date_str = date_m.group(1) if date_m else None
+        # ISO dates order lexically; most of the library predates any cutoff
+        if min_date is not None and (date_str is None or date_str < min_date):
+            continue
+
         url_m = _RE_URL.search(body)
         if not url_m:
             continue
@@ -76,9 +68,6 @@ def _parse_bibtex(text):
         if not title:
             continue
 
-        date_m = _RE_DATE.search(body)
-        date_str = date_m.group(1) if date_m else None
-
         author_m = _RE_AUTHOR.search(body)
         author = author_m.group(1).strip() if author_m else None
 
@@ -94,6 +83,30 @@ def _parse_bibtex(text):
         }
 
 
+def _iter_entry_blocks(chunks):
+    """Regroup streamed text chunks into runs of complete BibTeX entries.
+
+    Each yielded block ends at the last entry terminator (``\n}``) seen so
+    far, so ``_parse_bibtex`` on a block finds exactly the entries it would
+    have found in the full text; the partial tail is carried over.
+
+    Args:
+        chunks: Iterable of decoded text chunks, in order.
+
+    Yields:
+        str: Text holding only whole entries (plus the final remainder).
+    """
+    pending = ""
+    for chunk in chunks:
+        pending += chunk
+        cut = pending.rfind("\n}")
+        if cut != -1:
+            yield pending[:cut + 2]
+            pending = pending[cut + 2:]
+    if pending:
+        yield pending
+
+
 def _format_author(author, organization):
     """Build a display author string like ``Author Name (Organization)``.
 
@@ -109,6 +122,37 @@ def _format_author(author, organization):
     return author or organization or None
 
 
+def _to_candidate(entry, cutoff):
+    """Turn a parsed BibTeX entry into an insert candidate, or None.
+
+    Args:
+        entry: Dict from ``_parse_bibtex``.
+        cutoff: Oldest acceptable publication ``datetime``.
+
+    Returns:
+        dict or None: ``title``, ``url``, ``pub_date`` and ``author`` for
+        an in-window, non-file entry; None if it is filtered out.
+    """
+    if not entry["date"]:
+        return None
+    try:
+        pub_date = datetime.strptime(entry["date"], "%Y-%m-%d")
+    except ValueError:
+        return None
+    if pub_date < cutoff:
+        return None
+
+    if is_file_url(entry["url"]):
+        return None
+
+    return {
+        "title": entry["title"],
+        "url": entry["url"],
+        "pub_date": pub_date,
+        "author": _format_author(entry["author"], entry["organization"]),
+    }
+
+
 def fetch_malpedia(lookback_days=1, since_last_fetch=False):
     """Fetch articles from Malpedia's BibTeX bibliography.
 
@@ -133,18 +177,6 @@ def fetch_malpedia(lookback_days=1, since_last_fetch=False):
 
     source_id = upsert_source("Malpedia", MALPEDIA_SOURCE_URL)
 
-    logger.info("Fetching Malpedia library...")
-    try:
-        resp = requests.get(
-            MALPEDIA_BIB_URL,
-            headers={"Authorization": f"APIToken {api_key}"},
-            timeout=MALPEDIA_TIMEOUT,
-        )
-        resp.raise_for_status()
-    except requests.RequestException as e:
-        logger.error(f"Failed to fetch Malpedia BibTeX: {e}")
-        return 0
-
     if since_last_fetch:
         from database import get_source_last_fetched
 
@@ -155,32 +187,34 @@ def fetch_malpedia(lookback_days=1, since_last_fetch=False):
             cutoff = datetime.utcnow() - timedelta(days=lookback_days)
     else:
         cutoff = datetime.utcnow() - timedelta(days=lookback_days)
+    min_date = cutoff.date().isoformat()
     candidates = []
 
-    for entry in _parse_bibtex(resp.text):
-        # Filter by date
-        if not entry["date"]:
-            continue
-        try:
-            pub_date = datetime.strptime(entry["date"], "%Y-%m-%d")
-        except ValueError:
-            continue
-        if pub_date < cutoff:
-            continue
-
-        if _is_file_url(entry["url"]):
-            continue
-
-        # Deduplicate against existing articles
-        if article_exists(entry["url"]):
-            continue
+    # Entries are parsed as the body streams in, so regex work overlaps the
+    # download and the full payload is never held as bytes plus str
+    logger.info("Fetching Malpedia library...")
+    try:
+        with _session.get(
+            MALPEDIA_BIB_URL,
+            headers={"Authorization": f"APIToken {api_key}"},
+            timeout=MALPEDIA_TIMEOUT,
+            stream=True,
+        ) as resp:
+            resp.raise_for_status()
+            resp.encoding = resp.encoding or "utf-8"
+            chunks = resp.iter_content(chunk_size=MALPEDIA_CHUNK_SIZE, decode_unicode=True)
+            for block in _iter_entry_blocks(chunks):
+                for entry in _parse_bibtex(block, min_date=min_date):
+                    candidate = _to_candidate(entry, cutoff)
+                    if candidate:
+                        candidates.append(candidate)
+    except requests.RequestException as e:
+        logger.error(f"Failed to fetch Malpedia BibTeX: {e}")
+        return 0
 
-        candidates.append({
-            "title": entry["title"],
-            "url": entry["url"],
-            "pub_date": pub_date,
-            "author": _format_author(entry["author"], entry["organization"]),
-        })
+    # Deduplicate against existing articles in one query
+    known = existing_article_urls(c["url"] for c in candidates)
+    candidates = [c for c in candidates if c["url"] not in known]
 
     if not candidates:
         logger.info("Malpedia: no new candidates after filtering")
@@ -191,24 +225,24 @@ def fetch_malpedia(lookback_days=1, since_last_fetch=False):
     titles = [c["title"] for c in candidates]
     relevance = check_relevance(titles)
 
-    new_count = 0
-    skipped_irrelevant = 0
-    for candidate, is_relevant in zip(candidates, relevance):
-        if not is_relevant:
-            skipped_irrelevant += 1
-            continue
-
-        article_id = insert_article(
-            source_id=source_id,
-            title=candidate["title"],
-            url=candidate["url"],
-            author=candidate["author"],
-            published_date=candidate["pub_date"].isoformat(),
+    rows = [
+        (
+            source_id,
+            candidate["title"],
+            candidate["url"],
+            candidate["author"],
+            candidate["pub_date"].isoformat(),
+            None,
         )
-        if article_id:
-            new_count += 1
-
-    update_source_fetched(source_id)
+        for candidate, is_relevant in zip(candidates, relevance)
+        if is_relevant
+    ]
+    skipped_irrelevant = len(candidates) - len(rows)
+
+    # One transaction and one statement for all inserts
+    with batch():
+        new_count = insert_articles(rows)
+        update_source_fetched(source_id)
     logger.info(
         f"Malpedia: {new_count} new, {skipped_irrelevant} irrelevant, "
         f"{len(candidates) - new_count - skipped_irrelevant} other skipped"
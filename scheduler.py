@@ -22,10 +22,46 @@ _cost_event = threading.Event()
 _actual_cost = None          # dict: {article_count, actual_cost, model} or None
 _pipeline_stage = None       # current stage string for status polling
 
+# Bumped (under _state_cond) whenever any status getter below may return
+# something new, so status streams can block instead of polling.
+_state_version = 0
+_state_cond = threading.Condition()
+
+
+def _notify_state_change():
+    """Wake every ``wait_for_state_change`` caller."""
+    global _state_version
+    with _state_cond:
+        _state_version += 1
+        _state_cond.notify_all()
+
+
+def _set_stage(stage):
+    global _pipeline_stage
+    _pipeline_stage = stage
+    _notify_state_change()
+
+
+def wait_for_state_change(last_version, timeout=None):
+    """Block until the pipeline state version differs from ``last_version``.
+
+    Args:
+        last_version: The version the caller last observed (``None`` to
+            return immediately).
+        timeout: Maximum seconds to wait.
+
+    Returns:
+        The current state version; equal to ``last_version`` on timeout.
+    """
+    with _state_cond:
+        if last_version is not None:
+            _state_cond.wait_for(lambda: _state_version != last_version, timeout=timeout)
+        return _state_version
+
 
 def _run_pipeline(lookback_days=1, since_last_fetch=False):
     """Execute the full ingestion pipeline under an exclusive lock."""
-    global _is_refreshing, _cost_estimate, _cost_decision, _actual_cost, _pipeline_stage
+    global _is_refreshing, _cost_estimate, _cost_decision, _actual_cost
     global _abort_requested
 
     if not _refresh_lock.acquire(blocking=False):
@@ -37,7 +73,7 @@ def _run_pipeline(lookback_days=1, since_last_fetch=False):
     _cost_estimate = None
     _cost_decision = None
     _actual_cost = None
-    _pipeline_stage = "fetch"
+    _set_stage("fetch")
     cost_tracker.reset()
 
     try:
@@ -59,7 +95,7 @@ def _run_pipeline(lookback_days=1, since_last_fetch=False):
         logger.info(f"Fetched {new_articles} new articles from RSS feeds")
 
         if _abort_requested:
-            _pipeline_stage = "aborted"
+            _set_stage("aborted")
             return
 
         malpedia_new = fetch_malpedia(lookback_days=lookback_days, since_last_fetch=since_last_fetch)
@@ -67,7 +103,7 @@ def _run_pipeline(lookback_days=1, since_last_fetch=False):
         new_articles += malpedia_new
 
         # Scrape all pending articles in batches
-        _pipeline_stage = "scrape"
+        _set_stage("scrape")
         total_scraped = 0
         while not _abort_requested:
             batch = scrape_unscraped_articles(limit=10)
@@ -77,19 +113,19 @@ def _run_pipeline(lookback_days=1, since_last_fetch=False):
         logger.info(f"Scraped {total_scraped} articles total")
 
         if _abort_requested:
-            _pipeline_stage = "aborted"
+            _set_stage("aborted")
             return
 
         # Mark near-duplicate coverage before summarization so only one article per
         # cluster is summarized (silent no-op without an OpenAI key or when disabled).
-        _pipeline_stage = "dedup"
+        _set_stage("dedup")
         from embeddings import deduplicate_pending_articles
         marked = deduplicate_pending_articles()
         if marked:
             logger.info(f"Marked {marked} near-duplicate articles, skipping their summarization")
 
         if _abort_requested:
-            _pipeline_stage = "aborted"
+            _set_stage("aborted")
             return
 
         # Cost confirmation before summarization
@@ -108,7 +144,7 @@ def _run_pipeline(lookback_days=1, since_last_fetch=False):
                     "estimated_cost": round(estimated, 4),
                     "model": model,
                 }
-                _pipeline_stage = "confirm"
+                _set_stage("confirm")
                 _cost_event.clear()
                 _cost_decision = None
 
@@ -130,11 +166,11 @@ def _run_pipeline(lookback_days=1, since_last_fetch=False):
                 _cost_estimate = None
 
         if _abort_requested:
-            _pipeline_stage = "aborted"
+            _set_stage("aborted")
             return
 
         if not summarization_skipped and to_summarize > 0:
-            _pipeline_stage = "summarize"
+            _set_stage("summarize")
             while not _abort_requested:
                 batch = summarize_pending()
                 if batch == 0:
@@ -157,11 +193,11 @@ def _run_pipeline(lookback_days=1, since_last_fetch=False):
             logger.info("Pipeline complete")
 
         if _abort_requested:
-            _pipeline_stage = "aborted"
+            _set_stage("aborted")
             return
 
         # Generate embeddings for summarized articles
-        _pipeline_stage = "embed"
+        _set_stage("embed")
         from embeddings import embed_pending_articles
         total_embedded = 0
         while not _abort_requested:
@@ -169,15 +205,17 @@ def _run_pipeline(lookback_days=1, since_last_fetch=False):
             if batch == 0:
                 break
             total_embedded += batch
+            _notify_state_change()
         logger.info(f"Generated embeddings for {total_embedded} articles total")
 
-        _pipeline_stage = "done" if not _abort_requested else "aborted"
+        _set_stage("done" if not _abort_requested else "aborted")
     except Exception as e:
         logger.error(f"Pipeline error: {e}")
-        _pipeline_stage = "error"
+        _set_stage("error")
     finally:
         _is_refreshing = False
         _refresh_lock.release()
+        _notify_state_change()
 
 
 def _reschedule_digest(config=None):
@@ -260,6 +298,7 @@ def approve_cost():
     global _cost_decision
     _cost_decision = "approved"
     _cost_event.set()
+    _notify_state_change()
 
 
 def decline_cost():
@@ -267,6 +306,7 @@ def decline_cost():
     global _cost_decision
     _cost_decision = "declined"
     _cost_event.set()
+    _notify_state_change()
 
 
 def get_actual_cost():
@@ -278,6 +318,7 @@ def dismiss_actual_cost():
     """Clear the actual cost so the dialog isn't shown again."""
     global _actual_cost
     _actual_cost = None
+    _notify_state_change()
 
 
 def abort_pipeline():
@@ -289,6 +330,7 @@ def abort_pipeline():
     global _abort_requested
     _abort_requested = True
     _cost_event.set()  # Wake cost-confirmation wait immediately
+    _notify_state_change()
 
 
 def is_aborting():
@@ -298,7 +340,7 @@ def is_aborting():
 
 def _run_embed_only():
     """Generate embeddings for all pending articles without fetching feeds."""
-    global _is_embedding_only, _pipeline_stage, _abort_requested  # noqa: PLW0603
+    global _is_embedding_only, _abort_requested  # noqa: PLW0603
 
     if not _refresh_lock.acquire(blocking=False):
         logger.info("Another job is running, skipping embed-only")
@@ -306,7 +348,7 @@ def _run_embed_only():
 
     _is_embedding_only = True
     _abort_requested = False
-    _pipeline_stage = "embed"
+    _set_stage("embed")
 
     try:
         from embeddings import embed_pending_articles
@@ -317,14 +359,16 @@ def _run_embed_only():
             if batch == 0:
                 break
             total_embedded += batch
+            _notify_state_change()
         logger.info(f"Embed-only job: generated embeddings for {total_embedded} articles")
-        _pipeline_stage = "done" if not _abort_requested else "aborted"
+        _set_stage("done" if not _abort_requested else "aborted")
     except Exception as e:
         logger.error(f"Embed-only job error: {e}")
-        _pipeline_stage = "error"
+        _set_stage("error")
     finally:
         _is_embedding_only = False
         _refresh_lock.release()
+        _notify_state_change()
 
 
 def trigger_embed():
@@ -352,7 +396,7 @@ def _run_process_pending(article_ids=None):
         article_ids: Optional list of article IDs to restrict processing to.
             When provided, only those specific articles are processed.
     """
-    global _is_refreshing, _pipeline_stage, _cost_estimate, _cost_decision, _actual_cost
+    global _is_refreshing, _cost_estimate, _cost_decision, _actual_cost
     global _abort_requested
 
     if not _refresh_lock.acquire(blocking=False):
@@ -364,7 +408,7 @@ def _run_process_pending(article_ids=None):
     _cost_estimate = None
     _cost_decision = None
     _actual_cost = None
-    _pipeline_stage = "scrape"
+    _set_stage("scrape")
     cost_tracker.reset()
 
     try:
@@ -383,7 +427,7 @@ def _run_process_pending(article_ids=None):
         logger.info(f"Scraped {total_scraped} articles")
 
         if _abort_requested:
-            _pipeline_stage = "aborted"
+            _set_stage("aborted")
             return
 
         # Cost gate — count only the articles in scope
@@ -404,7 +448,7 @@ def _run_process_pending(article_ids=None):
                     "estimated_cost": round(estimated, 4),
                     "model": model,
                 }
-                _pipeline_stage = "confirm"
+                _set_stage("confirm")
                 _cost_event.clear()
                 _cost_decision = None
                 _cost_event.wait(timeout=300)
@@ -416,11 +460,11 @@ def _run_process_pending(article_ids=None):
                 _cost_estimate = None
 
         if _abort_requested:
-            _pipeline_stage = "aborted"
+            _set_stage("aborted")
             return
 
         if not summarization_skipped and to_summarize > 0:
-            _pipeline_stage = "summarize"
+            _set_stage("summarize")
             while not _abort_requested:
                 batch = summarize_pending(article_ids=article_ids)
                 if batch == 0:
@@ -438,22 +482,24 @@ def _run_process_pending(article_ids=None):
                 }
 
         if _abort_requested:
-            _pipeline_stage = "aborted"
+            _set_stage("aborted")
             return
 
-        _pipeline_stage = "embed"
+        _set_stage("embed")
         while not _abort_requested:
             batch = embed_pending_articles(limit=50, article_ids=article_ids)
             if batch == 0:
                 break
+            _notify_state_change()
 
-        _pipeline_stage = "done" if not _abort_requested else "aborted"
+        _set_stage("done" if not _abort_requested else "aborted")
     except Exception as e:
         logger.error(f"Process-pending error: {e}")
-        _pipeline_stage = "error"
+        _set_stage("error")
     finally:
         _is_refreshing = False
         _refresh_lock.release()
+        _notify_state_change()
 
 
 def trigger_process_pending(article_ids=None):
@@ -494,6 +540,7 @@ def _run_digest(force=False):
         return
 
     _is_digesting = True
+    _notify_state_change()
     try:
         from datetime import datetime, timedelta
         from database import get_last_digest_sent_at, get_articles_with_embeddings_since, log_digest_sent
@@ -587,6 +634,7 @@ def _run_digest(force=False):
         logger.error(f"Digest job error: {e}")
     finally:
         _is_digesting = False
+        _notify_state_change()
 
 
 def trigger_send_digest():
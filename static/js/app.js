@@ -924,65 +924,104 @@ function pollRefreshStatus(btn, status) {
     if (abortBtn) { abortBtn.style.display = 'inline-flex'; abortBtn.disabled = false; }
     if (embedBtn) embedBtn.disabled = true;
 
-    const interval = setInterval(async () => {
-        if (Date.now() - startTime > MAX_POLL_MS) {
-            clearInterval(interval);
-            if (abortBtn) abortBtn.style.display = 'none';
-            if (embedBtn) embedBtn.disabled = false;
-            if (status) {
-                status.textContent = 'Still processing in background...';
-                status.className = 'refresh-status';
-                setTimeout(() => { status.textContent = ''; }, 5000);
-            }
-            resetBtns();
-            cachedCategories = null;
-            loadCategories();
-            loadStats();
-            return;
+    // Status arrives over Server-Sent Events (pushed only on change); if the
+    // stream is unavailable or drops, fall back to polling /api/refresh-status.
+    let source = null;
+    let interval = null;
+    let stopped = false;
+    const stop = () => {
+        stopped = true;
+        if (source) { source.close(); source = null; }
+        if (interval) { clearInterval(interval); interval = null; }
+        clearTimeout(deadline);
+    };
+
+    const finishControls = () => {
+        if (abortBtn) abortBtn.style.display = 'none';
+        if (embedBtn) embedBtn.disabled = false;
+        resetBtns();
+        cachedCategories = null;
+        loadCategories();
+    };
+
+    const deadline = setTimeout(() => {
+        stop();
+        if (status) {
+            status.textContent = 'Still processing in background...';
+            status.className = 'refresh-status';
+            setTimeout(() => { status.textContent = ''; }, 5000);
         }
+        finishControls();
+        loadStats();
+    }, MAX_POLL_MS);
 
-        try {
-            loadStats();
+    const handleStatus = (refreshData) => {
+        if (stopped) return;
+        loadStats();
 
-            const refreshRes = await fetch('/api/refresh-status');
-            const refreshData = await refreshRes.json();
+        // Update stage label
+        if (status && refreshData.stage && stageLabels[refreshData.stage]) {
+            status.textContent = stageLabels[refreshData.stage];
+        }
 
-            // Update stage label
-            if (status && refreshData.stage && stageLabels[refreshData.stage]) {
-                status.textContent = stageLabels[refreshData.stage];
-            }
+        // Show cost estimate modal if pipeline is waiting for confirmation
+        if (refreshData.cost_estimate) {
+            showCostEstimateModal(refreshData.cost_estimate);
+        }
 
-            // Show cost estimate modal if pipeline is waiting for confirmation
-            if (refreshData.cost_estimate) {
-                showCostEstimateModal(refreshData.cost_estimate);
-            }
+        // Show actual cost modal after summarization
+        if (refreshData.actual_cost) {
+            showActualCostModal(refreshData.actual_cost);
+        }
 
-            // Show actual cost modal after summarization
-            if (refreshData.actual_cost) {
-                showActualCostModal(refreshData.actual_cost);
+        if (!refreshData.is_refreshing) {
+            stop();
+            if (status) {
+                const label = refreshData.stage === 'aborted' ? 'Stopped.' : 'Complete!';
+                status.textContent = label;
+                status.className = 'refresh-status';
+                setTimeout(() => { status.textContent = ''; }, 5000);
             }
+            finishControls();
+        }
+    };
 
-            if (!refreshData.is_refreshing) {
-                clearInterval(interval);
+    const startPolling = () => {
+        if (stopped || interval) return;
+        interval = setInterval(async () => {
+            try {
+                const refreshRes = await fetch('/api/refresh-status');
+                handleStatus(await refreshRes.json());
+            } catch (e) {
+                stop();
                 if (abortBtn) abortBtn.style.display = 'none';
                 if (embedBtn) embedBtn.disabled = false;
-                if (status) {
-                    const label = refreshData.stage === 'aborted' ? 'Stopped.' : 'Complete!';
-                    status.textContent = label;
-                    status.className = 'refresh-status';
-                    setTimeout(() => { status.textContent = ''; }, 5000);
-                }
                 resetBtns();
-                cachedCategories = null;
-                loadCategories();
             }
-        } catch (e) {
-            clearInterval(interval);
-            if (abortBtn) abortBtn.style.display = 'none';
-            if (embedBtn) embedBtn.disabled = false;
-            resetBtns();
-        }
-    }, POLL_INTERVAL);
+        }, POLL_INTERVAL);
+    };
+
+    if (window.EventSource) {
+        source = new EventSource('/api/refresh-status/stream');
+        source.onmessage = (event) => {
+            try {
+                handleStatus(JSON.parse(event.data));
+            } catch (e) {
+                // Ignore a malformed event; the next change resends full state.
+            }
+        };
+        source.onerror = () => {
+            // The server ends each stream after a minute; the browser then
+            // reconnects on its own (readyState CONNECTING). Only fall back
+            // to polling when the stream was refused outright.
+            if (!source || source.readyState !== EventSource.CLOSED) return;
+            source.close();
+            source = null;
+            startPolling();
+        };
+    } else {
+        startPolling();
+    }
 }
 
 // On page load, restore the UI for a refresh that's already running on the server
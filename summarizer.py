@@ -12,6 +12,12 @@ from llm_client import has_api_key, get_model_name, call_llm
 
 logger = logging.getLogger(__name__)
 
+# Titles per relevance call; one prompt carries the whole numbered list.
+RELEVANCE_BATCH_SIZE = 25
+# Times a batch with a malformed reply may be halved before it is accepted
+# as relevant, so one batch costs at most 2 ** (n + 1) - 1 calls.
+RELEVANCE_MAX_SPLITS = 1
+
 RELEVANCE_PROMPT = """You are a cybersecurity threat-intelligence triage analyst.
 Classify each article title as RELEVANT or IRRELEVANT to cybersecurity threat research.
 
@@ -337,12 +343,63 @@ def _is_rate_limit_error(exc):
     return name == "RateLimitError" or "429" in msg or "rate limit" in msg
 
 
+def _classify_relevance_batch(batch, splits_left=RELEVANCE_MAX_SPLITS):
+    """Classify one batch of titles, halving it when the reply is malformed.
+
+    A truncated or miscounted JSON reply usually means the batch was too
+    long for the output budget, so the batch is split in two and each half
+    is retried, at most ``RELEVANCE_MAX_SPLITS`` levels deep. API errors
+    and batches that still fail to parse default to relevant.
+
+    Args:
+        batch: List of article title strings.
+        splits_left: Remaining halvings allowed for this batch.
+
+    Returns:
+        List of booleans, same length as ``batch``.
+    """
+    numbered = "\n".join(f'{j + 1}. "{t}"' for j, t in enumerate(batch))
+    prompt = RELEVANCE_PROMPT.format(titles=numbered)
+
+    try:
+        content, it, ot, cc, cr = call_llm(
+            None,
+            [{"role": "user", "content": prompt}],
+            temperature=0,
+            max_tokens=300,
+            json_mode=True,
+        )
+    except Exception as e:
+        logger.error(f"Relevance check failed for batch: {e}", exc_info=True)
+        return [True] * len(batch)  # Accept all on error
+    cost_tracker.add_tokens(it, ot, cc, cr)
+
+    try:
+        batch_results = json.loads(content)["relevant"]
+        if not isinstance(batch_results, list) or len(batch_results) != len(batch):
+            raise ValueError(f"expected {len(batch)} labels")
+        return [r is not False for r in batch_results]
+    except (ValueError, KeyError, TypeError) as e:
+        if len(batch) == 1 or splits_left <= 0:
+            logger.warning(
+                f"Unparseable relevance reply for {len(batch)} titles ({e}), accepting all"
+            )
+            return [True] * len(batch)
+        logger.warning(
+            f"Unparseable relevance reply for {len(batch)} titles ({e}), splitting batch"
+        )
+        mid = len(batch) // 2
+        return (_classify_relevance_batch(batch[:mid], splits_left - 1)
+                + _classify_relevance_batch(batch[mid:], splits_left - 1))
+
+
 def check_relevance(titles):
     """Batch-classify article titles for threat-research relevance via LLM.
 
-    Sends titles in batches of 25 to the configured OpenAI model for
-    binary classification. If the API key is not configured or a batch
-    fails, all titles in that batch default to relevant.
+    Sends titles in batches of ``RELEVANCE_BATCH_SIZE`` to the configured
+    model for binary classification. A batch whose reply cannot be parsed
+    is split in half and retried. If the API key is not configured or a
+    call fails, all titles in that batch default to relevant.
 
     Args:
         titles: List of article title strings to classify.
@@ -358,32 +415,8 @@ def check_relevance(titles):
         return [True] * len(titles)  # No API key → accept all
 
     results = []
-    BATCH = 25
-
-    for i in range(0, len(titles), BATCH):
-        batch = titles[i : i + BATCH]
-        numbered = "\n".join(f'{j + 1}. "{t}"' for j, t in enumerate(batch))
-        prompt = RELEVANCE_PROMPT.format(titles=numbered)
-
-        try:
-            content, it, ot, cc, cr = call_llm(
-                None,
-                [{"role": "user", "content": prompt}],
-                temperature=0,
-                max_tokens=300,
-                json_mode=True,
-            )
-            cost_tracker.add_tokens(it, ot, cc, cr)
-            data = json.loads(content)
-            batch_results = data.get("relevant", [True] * len(batch))
-            # Pad if the model returned fewer entries than expected
-            while len(batch_results) < len(batch):
-                batch_results.append(True)
-            results.extend(batch_results[: len(batch)])
-        except Exception as e:
-            logger.error(f"Relevance check failed for batch: {e}", exc_info=True)
-            results.extend([True] * len(batch))  # Accept all on error
-
+    for i in range(0, len(titles), RELEVANCE_BATCH_SIZE):
+        results.extend(_classify_relevance_batch(titles[i : i + RELEVANCE_BATCH_SIZE]))
     return results
 
 
@@ -577,7 +610,7 @@ def estimate_trend_cost(articles, model):
     return cost, n_quarters, n_years
 
 
-def generate_category_insight(category_name, subcategory_tag=None, since_days=None):
+def generate_category_insight(category_name, subcategory_tag=None, since_days=None, articles=None):
     """Generate trend analysis and forecast for a threat category.
 
     Retrieves all summarized articles for the given category (and
@@ -590,6 +623,8 @@ def generate_category_insight(category_name, subcategory_tag=None, since_days=No
         subcategory_tag: Optional entity tag to narrow the focus
             (e.g. ``"lockbit"``).
         since_days: If set, only include articles from the last N days.
+        articles: Optional pre-fetched result of ``get_articles_for_category``
+            for the same arguments; skips the database query when given.
 
     Returns:
         A dict with keys ``trend`` (markdown), ``forecast`` (markdown),
@@ -600,7 +635,8 @@ def generate_category_insight(category_name, subcategory_tag=None, since_days=No
         logger.warning("LLM API key not configured, skipping insight generation")
         return None
 
-    articles = get_articles_for_category(category_name, subcategory_tag=subcategory_tag, since_days=since_days)
+    if articles is None:
+        articles = get_articles_for_category(category_name, subcategory_tag=subcategory_tag, since_days=since_days)
     if len(articles) < 3:
         return None
 
@@ -884,7 +920,7 @@ def _generate_yearly_trend(category_name, year, quarterly_trends, prev_year_tren
         return None
 
 
-def generate_trend_analysis(category_name, subcategory_tag=None, since_days=None):
+def generate_trend_analysis(category_name, subcategory_tag=None, since_days=None, articles=None):
     """Generate quarterly and yearly historical trend analyses for a category.
 
     Groups summarized articles by quarter, generates per-quarter LLM analyses
@@ -901,6 +937,8 @@ def generate_trend_analysis(category_name, subcategory_tag=None, since_days=None
         subcategory_tag: Optional entity tag to narrow the focus.
         since_days: If set, only include articles from the last N days
             and skip the persistent cache.
+        articles: Optional pre-fetched result of ``get_articles_for_category``
+            for the same arguments; skips the database query when given.
 
     Returns:
         A dict with keys:
@@ -915,7 +953,8 @@ def generate_trend_analysis(category_name, subcategory_tag=None, since_days=None
         return None
 
     skip_cache = since_days is not None
-    articles = get_articles_for_category(category_name, subcategory_tag=subcategory_tag, since_days=since_days)
+    if articles is None:
+        articles = get_articles_for_category(category_name, subcategory_tag=subcategory_tag, since_days=since_days)
     if len(articles) < 3:
         return None
 
@@ -1130,7 +1169,7 @@ def summarize_pending(limit=10, article_ids=None):
         title = article["title"]
         content = article["content_raw"]
         article_id = article["id"]
-        article_url = article.get("url", "")
+        article_url = article["url"] or ""
 
         logger.info(f"Summarizing article {article_id}: {title[:60]}")
         result = summarize_article(title, content)